@@ -1,364 +1,659 @@
-import os
-import time
-import pandas as pd
-import streamlit as st
-from datetime import datetime
-from io import BytesIO
-
-# Supondo que seus arquivos estão em uma pasta 'utils'
-from utils.serp_client import SerpAPIClient
-from utils.data_enrichment import DataEnricher 
-
-# Nota: O arquivo minin_data.py parece ser um duplicado de data_enrichment.py
-# Se for o caso, pode ser removido para simplificar o projeto.
-from utils.mining_data import MINING_SEARCH_TERMS
-
-# ==================== CONFIGURAÇÃO DA PÁGINA ====================
-
-st.set_page_config(
-    page_title="Prospector de Mineradoras - Pará",
-    page_icon="⛏️",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# ==================== INICIALIZAÇÃO ====================
-
-def initialize_session_state():
-    """Inicializa o estado da sessão"""
-    if "search_results" not in st.session_state:
-        st.session_state.search_results = []
-    if "enriched_results" not in st.session_state:
-        st.session_state.enriched_results = []
-    if "search_history" not in st.session_state:
-        st.session_state.search_history = []
-
-initialize_session_state()
-
-# ==================== INTERFACE PRINCIPAL ====================
-
-def main():
-    # Header
-    st.title("⛏️ Prospector de Mineradoras - Pará")
-    st.markdown("""
-    ### 🎯 Ferramenta especializada para prospecção de empresas de mineração no Pará
-    **Foco:** Clientes potenciais para peças de freio de caminhão e equipamentos de mineração
-    """)
-    
-    # Sidebar - Configurações
-    with st.sidebar:
-        st.header("⚙️ Configurações")
-        
-        serp_api_key = st.text_input(
-            "🔑 SERP API Key:",
-            type="password",
-            help="Sua chave da API do SERP API",
-            value=os.getenv("SERP_API_KEY", "")
-        )
-        
-        st.divider()
-        
-        st.subheader("🔍 Parâmetros de Busca")
-        
-        search_terms = st.multiselect(
-            "Termos de busca:",
-            options=list(MINING_SEARCH_TERMS.keys()),
-            default=list(MINING_SEARCH_TERMS.keys())[:3],
-            format_func=lambda x: f"{x} ({MINING_SEARCH_TERMS[x]['description']})"
-        )
-        
-        num_results = st.slider(
-            "Máximo de resultados por termo:",
-            min_value=10,
-            max_value=100,
-            value=20,
-            step=10
-        )
-        
-        st.divider()
-        
-        st.subheader("📊 Enriquecimento de Dados")
-        
-        enrich_data = st.checkbox("Enriquecer dados via APIs públicas", value=True)
-        include_cnpj = st.checkbox("Buscar dados de CNPJ", value=True)
-        include_contacts = st.checkbox("Buscar contatos e redes sociais", value=True)
-        
-        st.divider()
-        
-        st.subheader("🔧 Configurações Avançadas")
-        
-        delay_between_requests = st.slider(
-            "Delay entre requisições (segundos):",
-            min_value=1,
-            max_value=10,
-            value=3,
-            help="Ajuda a evitar bloqueios da API"
-        )
-        
-        enable_filters = st.checkbox("Aplicar filtros específicos de mineração", value=True)
-
-    # ==================== ÁREA PRINCIPAL ====================
-    
-    if not serp_api_key:
-        st.error("🔑 Por favor, insira sua chave da API do SERP API na barra lateral")
-        st.info("""
-        **Como obter uma chave da SERP API:**
-        1. Acesse https://serpapi.com
-        2. Crie uma conta gratuita
-        3. Copie sua API key do dashboard
-        4. Cole a chave na barra lateral
-        """)
-        return
-    
-    col1, col2, col3 = st.columns([2, 1, 1])
-    
-    with col1:
-        if st.button("🚀 Iniciar Prospecção", type="primary", disabled=not search_terms):
-            perform_search(serp_api_key, search_terms, num_results, delay_between_requests, 
-                         enrich_data, include_cnpj, include_contacts, enable_filters)
-    
-    with col2:
-        if st.session_state.enriched_results:
-            if st.button("🔄 Recarregar Dados"): # Nome mais claro
-                st.rerun()
-    
-    with col3:
-        if st.session_state.enriched_results:
-            if st.button("🗑️ Limpar Resultados"):
-                st.session_state.search_results = []
-                st.session_state.enriched_results = []
-                st.rerun()
-    
-    # ==================== EXIBIÇÃO DOS RESULTADOS ====================
-    
-    if st.session_state.enriched_results:
-        st.success(f"✅ Prospecção concluída! {len(st.session_state.enriched_results)} empresas encontradas")
-        
-        tab1, tab2, tab3 = st.tabs(["📋 Lista de Empresas", "📊 Análise", "📥 Exportar"])
-        
-        with tab1:
-            display_results_table()
-        
-        with tab2:
-            display_analytics()
-        
-        with tab3:
-            display_export_options()
-    
-    elif st.session_state.search_results:
-        st.info("🔄 Dados básicos coletados. Iniciando enriquecimento...")
-    
-    if st.session_state.search_history:
-        with st.expander("📜 Histórico de Buscas"):
-            for i, search in enumerate(reversed(st.session_state.search_history[-5:])):
-                st.text(f"{search['timestamp']} - {search['terms_count']} termos - {search['results_count']} resultados")
-
-def perform_search(api_key, search_terms, num_results, delay, enrich_data, include_cnpj, include_contacts, enable_filters):
-    """Executa a busca principal"""
-    try:
-        st.session_state.search_results = []
-        st.session_state.enriched_results = []
-        
-        serp_client = SerpAPIClient(api_key)
-        
-        progress_bar = st.progress(0, text="Iniciando busca...")
-        status_text = st.empty()
-        
-        all_results = []
-        
-        for i, term in enumerate(search_terms):
-            status_text.text(f"🔍 Buscando: {term}...")
-            
-            search_query = MINING_SEARCH_TERMS[term]['query']
-            
-            results = serp_client.search_local_businesses(
-                query=search_query,
-                location="Pará, Brasil",
-                num_results=num_results,
-                enable_filters=enable_filters
-            )
-            
-            if results:
-                for result in results:
-                    result['search_term'] = term
-                    result['search_timestamp'] = datetime.now().isoformat()
-                
-                all_results.extend(results)
-                st.session_state.search_results.extend(results)
-            
-            progress_bar.progress((i + 1) / len(search_terms) * 0.5, text=f"Buscando: {term}")
-            
-            if i < len(search_terms) - 1:
-                time.sleep(delay)
-        
-        unique_results = remove_duplicates(all_results)
-        st.session_state.search_results = unique_results
-        
-        status_text.text(f"✅ Busca concluída: {len(unique_results)} empresas únicas encontradas.")
-        
-        if enrich_data and unique_results:
-            status_text.text("📊 Enriquecendo dados...")
-            
-            enricher = DataEnricher()
-            enriched = enricher.enrich_companies(
-                unique_results,
-                include_cnpj=include_cnpj,
-                include_contacts=include_contacts,
-                progress_callback=lambda p: progress_bar.progress(0.5 + p * 0.5, text=f"Enriquecendo... {int(p*100)}%")
-            )
-            
-            st.session_state.enriched_results = enriched
-        else:
-            st.session_state.enriched_results = unique_results
-        
-        st.session_state.search_history.append({
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M"),
-            'terms_count': len(search_terms),
-            'results_count': len(unique_results)
-        })
-        
-        progress_bar.empty()
-        status_text.empty()
-        
-        st.rerun()
-        
-    except Exception as e:
-        st.error(f"❌ Erro durante a busca: {str(e)}")
-
-def remove_duplicates(results):
-    """Remove empresas duplicadas baseado em nome e endereço"""
-    seen = set()
-    unique_results = []
-    
-    for result in results:
-        name = result.get('name', '').strip().lower()
-        # Usa os primeiros 15 caracteres do endereço para evitar pequenas variações
-        address = result.get('address', '').strip().lower()[:15]
-        key = f"{name}|{address}"
-        
-        if key not in seen and name:
-            seen.add(key)
-            unique_results.append(result)
-    
-    return unique_results
-
-def display_results_table():
-    """Exibe a tabela de resultados"""
-    if not st.session_state.enriched_results:
-        return
-    
-    df = pd.DataFrame(st.session_state.enriched_results)
-    
-    display_columns = [
-        'name', 'address', 'phone', 'website', 'rating', 'reviews',
-        'cnpj', 'razao_social', 'email_oficial', 'social_media'
-    ]
-    
-    available_columns = [col for col in display_columns if col in df.columns]
-    
-    if available_columns:
-        column_names = {
-            'name': 'Nome', 'address': 'Endereço', 'phone': 'Telefone',
-            'website': 'Website', 'rating': 'Avaliação', 'reviews': 'Nº Avaliações',
-            'cnpj': 'CNPJ', 'razao_social': 'Razão Social', 
-            'email_oficial': 'Email', 'social_media': 'Redes Sociais'
-        }
-        
-        display_df = df[available_columns].copy()
-        display_df = display_df.rename(columns=column_names)
-        
-        st.dataframe(
-            display_df,
-            use_container_width=True,
-            hide_index=True,
-            column_config={
-                "Website": st.column_config.LinkColumn("Website", display_text="Acessar"),
-                "Avaliação": st.column_config.NumberColumn(format="%.1f ⭐"),
-                "Redes Sociais": st.column_config.TextColumn(width="medium")
-            }
-        )
-    else:
-        st.warning("Nenhum dado disponível para exibição")
-
-def display_analytics():
-    """Exibe análises dos dados coletados"""
-    if not st.session_state.enriched_results:
-        return
-    
-    df = pd.DataFrame(st.session_state.enriched_results)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.metric("Total de Empresas", len(df))
-        
-        phone_series = df.get('phone', pd.Series(dtype='object'))
-        with_phone = len(df[phone_series.notna() & (phone_series != '')])
-        st.metric("Com Telefone", with_phone, f"{with_phone/len(df)*100:.1f}%")
-        
-        website_series = df.get('website', pd.Series(dtype='object'))
-        with_website = len(df[website_series.notna() & (website_series != '')])
-        st.metric("Com Website", with_website, f"{with_website/len(df)*100:.1f}%")
-    
-    with col2:
-        if 'search_term' in df.columns:
-            st.subheader("Distribuição por Termo de Busca")
-            term_counts = df['search_term'].value_counts()
-            st.bar_chart(term_counts)
-        
-        if 'rating' in df.columns and len(df[df['rating'].notna()]) > 0:
-            avg_rating = df['rating'].mean()
-            st.metric("Avaliação Média", f"{avg_rating:.1f} ⭐")
-
-def display_export_options():
-    """Exibe opções de exportação"""
-    if not st.session_state.enriched_results:
-        return
-    
-    st.subheader("📥 Exportar Dados")
-    
-    df = pd.DataFrame(st.session_state.enriched_results)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        csv_data = df.to_csv(index=False, encoding='utf-8-sig')
-        st.download_button(
-            label="📄 Baixar CSV",
-            data=csv_data,
-            file_name=f"mineradoras_para_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-            mime="text/csv"
-        )
-    
-    with col2:
-        excel_buffer = BytesIO()
-        
-        with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Mineradoras')
-            
-            # --- CORREÇÃO APLICADA AQUI ---
-            phone_series = df.get('phone', pd.Series(dtype='object'))
-            website_series = df.get('website', pd.Series(dtype='object'))
-            
-            summary_data = {
-                'Métrica': ['Total de Empresas', 'Com Telefone', 'Com Website', 'Com Email'],
-                'Valor': [
-                    len(df),
-                    len(df[phone_series.notna() & (phone_series != '')]),
-                    len(df[website_series.notna() & (website_series != '')]),
-                    len(df[df.get('email_oficial', pd.Series(dtype='object')).notna() & (df.get('email_oficial', pd.Series(dtype='object')) != '')])
-                ]
-            }
-            pd.DataFrame(summary_data).to_excel(writer, index=False, sheet_name='Resumo')
-        
-        excel_data = excel_buffer.getvalue()
-
-        st.download_button(
-            label="📊 Baixar Excel",
-            data=excel_data,
-            file_name=f"mineradoras_para_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-
-if __name__ == "__main__":
-    main()
+import os
+import json
+import time
+import streamlit as st
+from datetime import datetime
+from functools import partial
+
+# Supondo que seus arquivos estão em uma pasta 'utils'
+# Módulos pesados (pandas, bs4, openpyxl) são importados só quando a funcionalidade é usada
+from utils.serp_client import SerpAPIClient, remove_duplicates
+from utils.leads import LeadStore
+from utils.metrics import PipelineMetrics
+from utils.shared_cache import SharedCache
+
+# Nota: O arquivo minin_data.py parece ser um duplicado de data_enrichment.py
+# Se for o caso, pode ser removido para simplificar o projeto.
+from utils.mining_data import MINING_SEARCH_TERMS, PARA_REFERENCE_POINTS
+
+# Arquivos exportados mais antigos que isso (s) são apagados na próxima exportação
+EXPORT_MAX_AGE_S = 1800
+
+# ==================== CONFIGURAÇÃO DA PÁGINA ====================
+
+st.set_page_config(
+    page_title="Prospector de Mineradoras - Pará",
+    page_icon="⛏️",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# ==================== RECURSOS COMPARTILHADOS ====================
+
+@st.cache_resource(show_spinner=False)
+def get_shared_cache() -> SharedCache:
+    """Cache de buscas SERP e consultas de CNPJ compartilhado por todas as sessões"""
+    return SharedCache(max_entries=5000, ttl=6 * 3600)
+
+@st.cache_resource(show_spinner=False)
+def get_serp_client(api_key: str) -> SerpAPIClient:
+    """Cliente SERP criado uma vez por processo para cada API key"""
+    return SerpAPIClient(api_key, cache=get_shared_cache())
+
+@st.cache_resource(show_spinner=False)
+def get_enricher():
+    """Enriquecedor (sessão HTTP e BeautifulSoup) criado uma vez por processo"""
+    from utils.data_enrichment import DataEnricher
+    return DataEnricher(cache=get_shared_cache())
+
+# ==================== INICIALIZAÇÃO ====================
+
+def initialize_session_state():
+    """Inicializa o estado da sessão"""
+    # Store único por sessão: registros base + deltas do enriquecimento
+    if "leads" not in st.session_state:
+        st.session_state.leads = LeadStore()
+    if "search_complete" not in st.session_state:
+        st.session_state.search_complete = False
+    if "enrichment_summary" not in st.session_state:
+        st.session_state.enrichment_summary = None
+    if "search_history" not in st.session_state:
+        st.session_state.search_history = []
+    if "performance_report" not in st.session_state:
+        st.session_state.performance_report = None
+    if "export_file" not in st.session_state:
+        st.session_state.export_file = None
+
+initialize_session_state()
+
+# ==================== INTERFACE PRINCIPAL ====================
+
+def main():
+    # Header
+    st.title("⛏️ Prospector de Mineradoras - Pará")
+    st.markdown("""
+    ### 🎯 Ferramenta especializada para prospecção de empresas de mineração no Pará
+    **Foco:** Clientes potenciais para peças de freio de caminhão e equipamentos de mineração
+    """)
+    
+    # Sidebar - Configurações
+    with st.sidebar:
+        st.header("⚙️ Configurações")
+        
+        serp_api_key = st.text_input(
+            "🔑 SERP API Key:",
+            type="password",
+            help="Sua chave da API do SERP API",
+            value=os.getenv("SERP_API_KEY", "")
+        )
+        
+        st.divider()
+        
+        st.subheader("🔍 Parâmetros de Busca")
+        
+        search_terms = st.multiselect(
+            "Termos de busca:",
+            options=list(MINING_SEARCH_TERMS.keys()),
+            default=list(MINING_SEARCH_TERMS.keys())[:3],
+            format_func=lambda x: f"{x} ({MINING_SEARCH_TERMS[x]['description']})"
+        )
+        
+        num_results = st.slider(
+            "Máximo de resultados por termo:",
+            min_value=10,
+            max_value=100,
+            value=20,
+            step=10
+        )
+        
+        st.divider()
+        
+        st.subheader("📊 Enriquecimento de Dados")
+        
+        enrich_data = st.checkbox("Enriquecer dados via APIs públicas", value=True)
+        include_cnpj = st.checkbox("Buscar dados de CNPJ", value=True)
+        hedge_cnpj = st.checkbox(
+            "Consultar outra API de CNPJ quando a primeira demorar",
+            value=True,
+            disabled=not include_cnpj,
+            help="Se a API não responder dentro do p95 da sua latência, a próxima é consultada em paralelo (até 50 consultas extras por busca)"
+        )
+        include_contacts = st.checkbox("Buscar contatos e redes sociais", value=True)
+        crawl_contact_pages = st.checkbox(
+            "Visitar páginas de contato dos sites",
+            value=True,
+            disabled=not include_contacts,
+            help="Procura emails e telefones em /contato, /fale-conosco e páginas semelhantes"
+        )
+        
+        time_budget = st.number_input(
+            "Tempo máximo de enriquecimento (min, 0 = sem limite):",
+            min_value=0,
+            value=0,
+            help="As empresas mais promissoras são enriquecidas primeiro; as demais ficam pendentes"
+        )
+        request_budget = st.number_input(
+            "Máximo de requisições no enriquecimento (0 = sem limite):",
+            min_value=0,
+            value=0,
+            step=50
+        )
+        
+        st.divider()
+        
+        st.subheader("🔧 Configurações Avançadas")
+        
+        delay_between_requests = st.slider(
+            "Delay entre requisições (segundos):",
+            min_value=1,
+            max_value=10,
+            value=3,
+            help="Ajuda a evitar bloqueios da API"
+        )
+        
+        enable_filters = st.checkbox("Aplicar filtros específicos de mineração", value=True)
+
+    # ==================== ÁREA PRINCIPAL ====================
+    
+    if not serp_api_key:
+        st.error("🔑 Por favor, insira sua chave da API do SERP API na barra lateral")
+        st.info("""
+        **Como obter uma chave da SERP API:**
+        1. Acesse https://serpapi.com
+        2. Crie uma conta gratuita
+        3. Copie sua API key do dashboard
+        4. Cole a chave na barra lateral
+        """)
+        return
+    
+    col1, col2, col3 = st.columns([2, 1, 1])
+    
+    with col1:
+        if st.button("🚀 Iniciar Prospecção", type="primary", disabled=not search_terms):
+            perform_search(serp_api_key, search_terms, num_results, delay_between_requests, 
+                         enrich_data, include_cnpj, include_contacts, enable_filters, crawl_contact_pages,
+                         time_budget, request_budget, hedge_cnpj)
+    
+    with col2:
+        if st.session_state.search_complete:
+            if st.button("🔄 Recarregar Dados"): # Nome mais claro
+                st.rerun()
+    
+    with col3:
+        if st.session_state.search_complete:
+            if st.button("🗑️ Limpar Resultados"):
+                st.session_state.leads = LeadStore()
+                st.session_state.pop("spatial_index", None)
+                st.session_state.pop("duplicate_groups", None)
+                st.session_state.search_complete = False
+                st.session_state.enrichment_summary = None
+                st.session_state.performance_report = None
+                discard_export()
+                st.rerun()
+    
+    # ==================== EXIBIÇÃO DOS RESULTADOS ====================
+    
+    if st.session_state.search_complete and st.session_state.leads:
+        st.success(f"✅ Prospecção concluída! {len(st.session_state.leads)} empresas encontradas")
+        
+        summary = st.session_state.enrichment_summary
+        if summary and summary['pending']:
+            st.warning(
+                f"⏳ Orçamento de {summary['stopped_by']} esgotado: {summary['enriched']} empresas enriquecidas "
+                f"(as mais promissoras), {summary['pending']} pendentes"
+            )
+        if summary and summary.get('failed'):
+            st.warning(f"⚠️ {summary['failed']} empresas não puderam ser enriquecidas (status 'erro')")
+        
+        tab1, tab2, tab3, tab4, tab5 = st.tabs(
+            ["📋 Lista de Empresas", "📊 Análise", "🗺️ Território", "⏱️ Desempenho", "📥 Exportar"]
+        )
+        
+        with tab1:
+            display_results_table()
+        
+        with tab2:
+            display_analytics()
+        
+        with tab3:
+            display_territory()
+        
+        with tab4:
+            display_performance()
+        
+        with tab5:
+            display_export_options()
+    
+    elif st.session_state.leads:
+        st.info("🔄 Dados básicos coletados. Iniciando enriquecimento...")
+    
+    if st.session_state.search_history:
+        with st.expander("📜 Histórico de Buscas"):
+            for i, search in enumerate(reversed(st.session_state.search_history[-5:])):
+                st.text(f"{search['timestamp']} - {search['terms_count']} termos - {search['results_count']} resultados")
+
+def perform_search(api_key, search_terms, num_results, delay, enrich_data, include_cnpj, include_contacts, enable_filters,
+                   crawl_contact_pages=True, time_budget=0, request_budget=0, hedge_cnpj=True):
+    """Executa a busca principal"""
+    try:
+        store = LeadStore()
+        st.session_state.leads = store
+        st.session_state.pop("spatial_index", None)
+        st.session_state.pop("duplicate_groups", None)
+        st.session_state.search_complete = False
+        st.session_state.enrichment_summary = None
+        st.session_state.performance_report = None
+        discard_export()
+        
+        metrics = PipelineMetrics()
+        serp_client = get_serp_client(api_key).for_run(metrics)
+        
+        progress_bar = st.progress(0, text="Iniciando busca...")
+        status_text = st.empty()
+        
+        all_results = []
+        
+        for i, term in enumerate(search_terms):
+            status_text.text(f"🔍 Buscando: {term}...")
+            
+            search_query = MINING_SEARCH_TERMS[term]['query']
+            
+            with metrics.stage('serp_search'):
+                results = serp_client.search_local_businesses(
+                    query=search_query,
+                    location="Pará, Brasil",
+                    num_results=num_results,
+                    enable_filters=enable_filters
+                )
+            
+            if results:
+                search_timestamp = datetime.now().isoformat()
+                for result in results:
+                    result.search_term = term
+                    result.search_timestamp = search_timestamp
+                
+                all_results.extend(results)
+            
+            progress_bar.progress((i + 1) / len(search_terms) * 0.5, text=f"Buscando: {term}")
+            
+            if i < len(search_terms) - 1:
+                with metrics.stage('sleep'):
+                    time.sleep(delay)
+        
+        with metrics.stage('dedup'):
+            unique_results = remove_duplicates(all_results)
+        store.leads = unique_results
+        
+        status_text.text(f"✅ Busca concluída: {len(unique_results)} empresas únicas encontradas.")
+        
+        if enrich_data and unique_results:
+            status_text.text("📊 Enriquecendo dados...")
+            
+            from utils.scheduler import EnrichmentScheduler
+            
+            enricher = get_enricher().for_run(metrics)
+            enricher.hedge_percentile = 95 if hedge_cnpj else None
+            scheduler = EnrichmentScheduler(
+                enricher,
+                max_seconds=time_budget * 60 if time_budget else None,
+                max_requests=request_budget or None
+            )
+            with metrics.stage('enrichment'):
+                st.session_state.enrichment_summary = scheduler.run(
+                    store,
+                    include_cnpj=include_cnpj,
+                    include_contacts=include_contacts,
+                    progress_callback=lambda p: progress_bar.progress(0.5 + p * 0.5, text=f"Enriquecendo... {int(p*100)}%"),
+                    crawl_contact_pages=crawl_contact_pages
+                )
+        
+        st.session_state.search_complete = True
+        
+        st.session_state.search_history.append({
+            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M"),
+            'terms_count': len(search_terms),
+            'results_count': len(unique_results)
+        })
+        
+        st.session_state.performance_report = metrics.to_dict()
+        
+        progress_bar.empty()
+        status_text.empty()
+        
+        st.rerun()
+        
+    except Exception as e:
+        st.error(f"❌ Erro durante a busca: {str(e)}")
+
+def display_results_table():
+    """Exibe a tabela de resultados"""
+    if not st.session_state.leads:
+        return
+    
+    store = st.session_state.leads
+    
+    display_columns = [
+        'name', 'address', 'phone', 'website', 'rating', 'reviews',
+        'cnpj', 'razao_social', 'email_oficial', 'emails_website', 'telefones_website', 'social_media',
+        'prioridade', 'enrichment_status'
+    ]
+    
+    columns = set(store.columns())
+    available_columns = [col for col in display_columns if col in columns]
+    
+    if available_columns:
+        column_names = {
+            'name': 'Nome', 'address': 'Endereço', 'phone': 'Telefone',
+            'website': 'Website', 'rating': 'Avaliação', 'reviews': 'Nº Avaliações',
+            'cnpj': 'CNPJ', 'razao_social': 'Razão Social', 
+            'email_oficial': 'Email', 'emails_website': 'Emails (Site)',
+            'telefones_website': 'Telefones (Site)', 'social_media': 'Redes Sociais',
+            'prioridade': 'Prioridade', 'enrichment_status': 'Enriquecimento'
+        }
+        
+        # Monta só as colunas exibidas, sem materializar o registro completo
+        display_df = store.to_dataframe(available_columns).rename(columns=column_names)
+        
+        st.dataframe(
+            display_df,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Website": st.column_config.LinkColumn("Website", display_text="Acessar"),
+                "Avaliação": st.column_config.NumberColumn(format="%.1f ⭐"),
+                "Redes Sociais": st.column_config.TextColumn(width="medium")
+            }
+        )
+    else:
+        st.warning("Nenhum dado disponível para exibição")
+
+def display_analytics():
+    """Exibe análises dos dados coletados"""
+    if not st.session_state.leads:
+        return
+    
+    from collections import Counter
+    from utils.exporters import summarize
+    
+    store = st.session_state.leads
+    # Resumo calculado em uma passada pelos leads, sem montar DataFrame
+    summary = summarize(store.records())
+    counts = summary.counts
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.metric("Total de Empresas", counts['total'])
+        st.metric("Com Telefone", counts['with_phone'], f"{counts['with_phone']/counts['total']*100:.1f}%")
+        st.metric("Com Website", counts['with_website'], f"{counts['with_website']/counts['total']*100:.1f}%")
+        st.metric("Com Email", counts['with_email'], f"{counts['with_email']/counts['total']*100:.1f}%")
+    
+    with col2:
+        term_counts = Counter(lead.search_term for lead in store if lead.search_term)
+        if term_counts:
+            st.subheader("Distribuição por Termo de Busca")
+            st.bar_chart(dict(term_counts.most_common()))
+        
+        if summary.average_rating is not None:
+            st.metric("Avaliação Média", f"{summary.average_rating:.1f} ⭐")
+
+def get_spatial_index():
+    """Índice espacial dos leads da sessão, reconstruído só quando o store muda"""
+    from utils.geo import LeadSpatialIndex
+    
+    store = st.session_state.leads
+    cached = st.session_state.get("spatial_index")
+    # Compara o próprio objeto (não id()): o cache mantém o store vivo, então não há reuso de endereço
+    if cached is None or cached[0] is not store or cached[1] is not store.leads or cached[2] != len(store):
+        cached = (store, store.leads, len(store), LeadSpatialIndex.from_store(store))
+        st.session_state.spatial_index = cached
+    return cached[3]
+
+def get_duplicate_groups(index, radius_m: int, compare_names: bool):
+    """Grupos de duplicatas, recalculados só quando o índice ou os parâmetros mudam"""
+    cached = st.session_state.get("duplicate_groups")
+    # Guarda o próprio índice: um índice novo (store novo) invalida o resultado
+    if cached is None or cached[0] is not index or cached[1] != (radius_m, compare_names):
+        store = st.session_state.leads
+        names = [lead.name for lead in store] if compare_names else None
+        cached = (index, (radius_m, compare_names), index.find_duplicates(radius_m, names=names))
+        st.session_state.duplicate_groups = cached
+    return cached[2]
+
+def territory_table(store, ids, distances=None):
+    """Tabela de leads (posições no store) com distância opcional"""
+    import pandas as pd
+    
+    rows = []
+    for position, lead_id in enumerate(ids):
+        lead = store.leads[lead_id]
+        row = {'Nome': lead.name, 'Endereço': lead.address, 'Telefone': lead.phone,
+               'Website': lead.website, 'lat': lead.lat, 'lng': lead.lng}
+        if distances is not None:
+            row['Distância (km)'] = round(float(distances[position]), 1)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+def display_territory():
+    """Consultas por raio, vizinhos mais próximos e duplicatas por proximidade"""
+    store = st.session_state.leads
+    index = get_spatial_index()
+    if not len(index):
+        st.info("Nenhuma empresa com coordenadas disponíveis")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        origin = st.selectbox("Ponto de referência:", list(PARA_REFERENCE_POINTS) + ["Coordenadas personalizadas"])
+        if origin in PARA_REFERENCE_POINTS:
+            lat, lng = PARA_REFERENCE_POINTS[origin]
+        else:
+            lat = st.number_input("Latitude:", value=-6.0676, format="%.4f")
+            lng = st.number_input("Longitude:", value=-49.9022, format="%.4f")
+    with col2:
+        radius_km = st.slider("Raio (km):", min_value=5, max_value=500, value=50, step=5)
+    with col3:
+        k = st.number_input("Empresas mais próximas:", min_value=1, max_value=100, value=10)
+    
+    ids, distances = index.within_radius(lat, lng, radius_km)
+    st.metric(f"Empresas a até {radius_km} km", len(ids), f"{len(index)} com coordenadas", delta_color="off")
+    
+    if len(ids):
+        radius_df = territory_table(store, ids, distances)
+        st.map(radius_df, latitude='lat', longitude='lng')
+        st.dataframe(radius_df.drop(columns=['lat', 'lng']), use_container_width=True, hide_index=True)
+    
+    st.subheader("Mais Próximas")
+    nearest_ids, nearest_distances = index.nearest(lat, lng, int(k))
+    st.dataframe(
+        territory_table(store, nearest_ids, nearest_distances).drop(columns=['lat', 'lng']),
+        use_container_width=True,
+        hide_index=True
+    )
+    
+    st.subheader("Possíveis Duplicatas por Proximidade")
+    col1, col2 = st.columns(2)
+    with col1:
+        radius_m = st.slider("Distância máxima (m):", min_value=10, max_value=1000, value=100, step=10)
+    with col2:
+        compare_names = st.checkbox("Exigir nomes parecidos", value=True)
+    
+    # Streamlit reexecuta todas as abas a cada interação; a varredura não deve acompanhar
+    groups = get_duplicate_groups(index, radius_m, compare_names)
+    if not groups:
+        st.caption("Nenhuma duplicata encontrada")
+        return
+    
+    st.caption(f"{len(groups)} grupos com {sum(len(group) for group in groups)} empresas")
+    duplicates_df = territory_table(store, [lead_id for group in groups for lead_id in group])
+    duplicates_df.insert(0, 'Grupo', [number for number, group in enumerate(groups, 1) for _ in group])
+    st.dataframe(duplicates_df, use_container_width=True, hide_index=True)
+
+def display_performance():
+    """Exibe métricas de desempenho da última execução"""
+    report = st.session_state.performance_report
+    if not report:
+        st.info("Nenhuma métrica de desempenho disponível para esta execução")
+        return
+    
+    import pandas as pd
+    
+    col1, col2, col3, col4 = st.columns(4)
+    total_requests = sum(h['requests'] for h in report['hosts'].values())
+    total_bytes = sum(h['bytes'] for h in report['hosts'].values())
+    col1.metric("Duração Total", f"{report['duration_s']:.1f} s")
+    col2.metric("Requisições HTTP", total_requests)
+    col3.metric("Dados Baixados", f"{total_bytes / 1024:.1f} KB")
+    col4.metric("Erros", sum(report['errors'].values()))
+    
+    st.subheader("Tempo por Estágio")
+    stages_df = pd.DataFrame([
+        {'Estágio': name, 'Chamadas': h['count'], 'Total (s)': h['total_s'],
+         'Média (s)': h['mean_s'], 'p50 (s)': h['p50_s'], 'p95 (s)': h['p95_s'], 'Máx (s)': h['max_s']}
+        for name, h in report['stages'].items()
+    ])
+    if not stages_df.empty:
+        stages_df = stages_df.sort_values('Total (s)', ascending=False)
+        st.dataframe(stages_df, use_container_width=True, hide_index=True)
+        st.bar_chart(stages_df.set_index('Estágio')['Total (s)'])
+    
+    st.subheader("Latência por Host")
+    hosts_df = pd.DataFrame([
+        {'Host': host, 'Requisições': h['requests'], 'KB': round(h['bytes'] / 1024, 1),
+         'Média (s)': h['mean_s'], 'p50 (s)': h['p50_s'], 'p95 (s)': h['p95_s'], 'Máx (s)': h['max_s']}
+        for host, h in report['hosts'].items()
+    ])
+    if not hosts_df.empty:
+        st.dataframe(hosts_df, use_container_width=True, hide_index=True)
+        with st.expander("Histogramas de latência por host"):
+            st.dataframe(
+                pd.DataFrame({host: h['buckets'] for host, h in report['hosts'].items()}),
+                use_container_width=True
+            )
+    
+    deduplicated = report['counters'].get('website_fetches_deduplicated', 0)
+    if deduplicated:
+        st.caption(f"🌐 {deduplicated} sites compartilhados por mais de uma empresa foram analisados uma única vez")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.subheader("Cache")
+        for name, entry in report['cache'].items():
+            hit_rate = entry['hit_rate'] or 0
+            st.metric(name, f"{hit_rate * 100:.1f}%", f"{entry['hits']} hits / {entry['misses']} misses", delta_color="off")
+    with col2:
+        st.subheader("Retentativas")
+        st.json(report['retries'] or {})
+    with col3:
+        st.subheader("Erros por Categoria")
+        st.json(report['errors'] or {})
+    
+    if report['counters']:
+        with st.expander("Contadores"):
+            st.json(report['counters'])
+    
+    st.download_button(
+        label="📈 Baixar Métricas (JSON)",
+        data=json.dumps(report, ensure_ascii=False, indent=2),
+        file_name=f"desempenho_{datetime.now().strftime('%Y%m%d_%H%M')}.json",
+        mime="application/json"
+    )
+
+def display_export_options():
+    """Exibe opções de exportação"""
+    if not st.session_state.leads:
+        return
+    
+    from utils.exporters import EXPORT_FORMATS
+    
+    st.subheader("📥 Exportar Dados")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        export_format = st.radio("Formato:", list(EXPORT_FORMATS), horizontal=True, on_change=discard_export)
+        # O arquivo só é gerado sob demanda, não a cada interação com a página
+        if st.button("⚙️ Gerar Arquivo"):
+            discard_export()
+            try:
+                st.session_state.export_file = build_export(export_format)
+            except Exception as e:
+                st.error(f"❌ Erro ao gerar o arquivo {export_format}: {str(e)}")
+    
+    with col2:
+        export_file = st.session_state.export_file
+        if export_file is not None and not os.path.exists(export_file['path']):
+            # Expirado (limpeza por idade): precisa ser gerado de novo
+            st.session_state.export_file = export_file = None
+        if export_file is not None:
+            st.download_button(
+                label=f"📄 Baixar {export_file['format']}",
+                # Lido do disco só quando o botão é clicado, não a cada rerun
+                data=partial(read_export, export_file['path']),
+                file_name=export_file['file_name'],
+                mime=export_file['mime'],
+                on_click="ignore"
+            )
+            st.caption(f"{export_file['size'] / 1024:.1f} KB")
+
+def get_export_dir() -> str:
+    """Diretório do app para arquivos exportados, comum a todas as sessões"""
+    import tempfile
+    
+    export_dir = os.path.join(tempfile.gettempdir(), "prospector_exports")
+    os.makedirs(export_dir, exist_ok=True)
+    return export_dir
+
+def cleanup_exports(export_dir: str, max_age: float = EXPORT_MAX_AGE_S):
+    """Apaga exportações antigas, inclusive as de sessões encerradas sem download"""
+    cutoff = time.time() - max_age
+    for entry in os.scandir(export_dir):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+def read_export(path: str) -> bytes:
+    """Conteúdo do arquivo exportado, lido no momento do download"""
+    with open(path, 'rb') as f:
+        return f.read()
+
+def build_export(export_format: str) -> dict:
+    """Gera o arquivo de exportação em disco; a sessão guarda só o caminho"""
+    import tempfile
+    from utils.exporters import EXPORT_FORMATS
+    
+    export_dir = get_export_dir()
+    cleanup_exports(export_dir)
+    
+    writer, extension, mime = EXPORT_FORMATS[export_format]
+    fd, path = tempfile.mkstemp(prefix="mineradoras_", suffix=f".{extension}", dir=export_dir)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            writer(st.session_state.leads, f)
+    except Exception:
+        # Não deixa arquivo parcial para trás
+        os.remove(path)
+        raise
+    
+    return {
+        'format': export_format,
+        'path': path,
+        'size': os.path.getsize(path),
+        'file_name': f"mineradoras_para_{datetime.now().strftime('%Y%m%d_%H%M')}.{extension}",
+        'mime': mime
+    }
+
+def discard_export():
+    """Apaga o arquivo gerado (troca de formato, novo arquivo ou nova busca)"""
+    export_file = st.session_state.get("export_file")
+    st.session_state.export_file = None
+    if export_file:
+        try:
+            os.remove(export_file['path'])
+        except OSError:
+            pass
+
+if __name__ == "__main__":
+    main()
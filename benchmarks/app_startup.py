@@ -0,0 +1,111 @@
+"""Mede a partida a frio e a latência de rerun do app Streamlit
+
+    python -m benchmarks.app_startup --reruns 20 --baseline 9203438
+
+A partida a frio é medida em um processo novo por amostra; os reruns usam o
+AppTest do Streamlit, que executa app.py do início ao fim como em cada interação.
+Com --baseline, o mesmo rerun é medido no app.py de outra revisão (git worktree
+temporário, em processo separado para não misturar os módulos de utils).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Importações feitas pelo app na primeira execução, sem nenhuma interação
+COLD_IMPORT = "import streamlit, utils.serp_client, utils.metrics, utils.mining_data"
+# Conjunto importado antes da carga preguiçosa (pandas, bs4 e openpyxl sempre)
+EAGER_IMPORT = COLD_IMPORT + ", pandas, utils.data_enrichment, openpyxl"
+
+
+def time_import(statement: str, samples: int) -> list:
+    """Tempo (s) de um import em processos Python novos"""
+    timings = []
+    code = f"import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)"
+    for _ in range(samples):
+        output = subprocess.run(
+            [sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        timings.append(float(output.stdout.strip()))
+    return timings
+
+
+def time_reruns(reruns: int, app_path: Path = ROOT / "app.py") -> dict:
+    """Tempo da primeira execução do script e dos reruns seguintes"""
+    from streamlit.testing.v1 import AppTest
+
+    os.environ.setdefault("SERP_API_KEY", "benchmark")
+    app = AppTest.from_file(str(app_path), default_timeout=60)
+
+    start = time.perf_counter()
+    app.run()
+    first = time.perf_counter() - start
+
+    timings = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        timings.append(time.perf_counter() - start)
+    return {'first_run_s': round(first, 4), 'reruns': timings}
+
+
+def time_baseline_reruns(revision: str, reruns: int) -> dict:
+    """Reruns do app.py de outra revisão, em worktree temporário e processo novo"""
+    with tempfile.TemporaryDirectory() as tmp:
+        worktree = Path(tmp) / "baseline"
+        subprocess.run(['git', 'worktree', 'add', '--detach', str(worktree), revision], cwd=ROOT, capture_output=True, check=True)
+        try:
+            output = subprocess.run(
+                [sys.executable, str(Path(__file__).resolve()), '--app', str(worktree / "app.py"),
+                 '--reruns', str(reruns), '--reruns-only'],
+                cwd=worktree, capture_output=True, text=True, check=True
+            )
+        finally:
+            subprocess.run(['git', 'worktree', 'remove', '--force', str(worktree)], cwd=ROOT, capture_output=True)
+    return json.loads(output.stdout)
+
+
+def _summary(timings: list) -> dict:
+    return {
+        'p50_s': round(statistics.median(timings), 4),
+        'max_s': round(max(timings), 4),
+        'samples': len(timings)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partida a frio e latência por interação do app")
+    parser.add_argument('--samples', type=int, default=5, help="processos novos para medir imports")
+    parser.add_argument('--reruns', type=int, default=20, help="reruns medidos via AppTest")
+    parser.add_argument('--app', type=Path, default=ROOT / "app.py", help="script Streamlit medido")
+    parser.add_argument('--baseline', help="revisão git cujo app.py também é medido (ex.: 9203438)")
+    parser.add_argument('--reruns-only', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--json', dest='json_path', help="grava o relatório em JSON")
+    args = parser.parse_args()
+
+    reruns = time_reruns(args.reruns, args.app)
+    report = {'first_run_s': reruns['first_run_s'], 'rerun': _summary(reruns['reruns'])}
+    if args.reruns_only:
+        print(json.dumps(report))
+        return
+
+    report['cold_import'] = _summary(time_import(COLD_IMPORT, args.samples))
+    report['eager_import'] = _summary(time_import(EAGER_IMPORT, args.samples))
+    if args.baseline:
+        report['baseline'] = time_baseline_reruns(args.baseline, args.reruns)
+
+    print(json.dumps(report, indent=2))
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+"""Servidores HTTP locais que imitam os serviços externos do pipeline"""
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+CITIES = ['Parauapebas', 'Marabá', 'Canaã dos Carajás', 'Belém', 'Santarém', 'Altamira', 'Itaituba']
+ACTIVITIES = ['Mineração', 'Mineradora', 'Pedreira', 'Extração de Ouro', 'Cooperativa Garimpeira']
+
+
+@dataclass
+class ServiceProfile:
+    """Comportamento simulado de um serviço"""
+    latency: float = 0.02       # latência média (s)
+    jitter: float = 0.01        # variação uniforme (+/- s)
+    error_rate: float = 0.0     # fração de respostas HTTP 500
+    page_size: int = 0          # bytes extras de HTML/JSON por resposta
+    slow_rate: float = 0.0      # fração de respostas que demoram slow_latency a mais (cauda)
+    slow_latency: float = 5.0
+
+
+def _digits(seed: str, length: int) -> str:
+    """Sequência numérica determinística a partir de uma semente"""
+    digest = hashlib.sha1(seed.encode('utf-8')).hexdigest()
+    return str(int(digest, 16))[:length].rjust(length, '0')
+
+
+def _format_cnpj(cnpj: str) -> str:
+    return f"{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Handler base: aplica latência, erros e padding conforme o perfil"""
+    profile: ServiceProfile = ServiceProfile()
+    services: Dict[str, str] = {}
+    rng = random.Random(42)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        profile = self.profile
+        delay = profile.latency + self.rng.uniform(-profile.jitter, profile.jitter)
+        if self.rng.random() < profile.slow_rate:
+            delay += profile.slow_latency
+        if delay > 0:
+            time.sleep(delay)
+
+        if self.rng.random() < profile.error_rate:
+            self._send(500, 'text/plain', b'erro simulado')
+            return
+
+        parsed = urlparse(self.path)
+        result = self.route(unquote(parsed.path), parse_qs(parsed.query))
+        if result is None:
+            self._send(404, 'text/plain', b'not found')
+            return
+
+        content_type, body = result
+        self._send(200, content_type, body.encode('utf-8'))
+
+    def route(self, path: str, query: Dict):
+        raise NotImplementedError
+
+    def padding(self) -> str:
+        return 'x' * self.profile.page_size
+
+    def _send(self, status: int, content_type: str, body: bytes):
+        self.send_response(status)
+        self.send_header('Content-Type', f"{content_type}; charset=utf-8")
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class SerpHandler(_Handler):
+    """Imita o engine google_maps da SERP API"""
+
+    def route(self, path, query):
+        q = query.get('q', [''])[0]
+        num = int(query.get('num', ['20'])[0])
+        results = []
+        for i in range(num):
+            seed = f"{q}|{i}"
+            city = CITIES[int(_digits(seed, 2)) % len(CITIES)]
+            activity = ACTIVITIES[int(_digits(seed + 'a', 2)) % len(ACTIVITIES)]
+            company_id = _digits(seed, 10)
+            results.append({
+                'title': f"{activity} {city} {company_id}",
+                'address': f"Rodovia PA-{100 + i % 400}, km {i % 90}, {city} - PA",
+                'phone': f"(94) 3{_digits(seed + 'p', 3)}-{_digits(seed + 'q', 4)}",
+                'website': f"{self.services['sites']}/empresa-{company_id}/",
+                'rating': round(3 + int(_digits(seed + 'r', 2)) % 20 / 10, 1),
+                'reviews': int(_digits(seed + 'v', 3)),
+                'type': 'Empresa de mineração',
+                'snippet': f"{activity} no Pará",
+                'place_id': f"place-{company_id}",
+                'gps_coordinates': {
+                    'latitude': -6.0 + int(_digits(seed + 'y', 4)) / 10000,
+                    'longitude': -50.0 + int(_digits(seed + 'x', 4)) / 10000
+                }
+            })
+        payload = {'local_results': results, 'padding': self.padding()}
+        return 'application/json', json.dumps(payload)
+
+
+class CnpjBizHandler(_Handler):
+    """Imita a busca e as páginas de detalhe do cnpj.biz"""
+
+    def route(self, path, query):
+        if path.startswith('/search/'):
+            cnpj = _digits(path, 14)
+            html = f"<html><body><a href='/cnpj/{cnpj}'>Resultado</a>{self.padding()}</body></html>"
+            return 'text/html', html
+        if path.startswith('/cnpj/'):
+            cnpj = path.rsplit('/', 1)[-1]
+            html = (
+                f"<html><body><h1>{_format_cnpj(cnpj)}</h1>"
+                f"<p>Sócio: Fulano {cnpj[:4]} da Silva</p>"
+                f"<p>Administrador: Beltrano {cnpj[4:8]} Souza</p>"
+                f"<p>contato{cnpj[:6]}@empresa.com.br</p>{self.padding()}</body></html>"
+            )
+            return 'text/html', html
+        return None
+
+
+class BrasilApiHandler(_Handler):
+    def route(self, path, query):
+        cnpj = path.rsplit('/', 1)[-1]
+        return 'application/json', json.dumps({
+            'razao_social': f"EMPRESA {cnpj} LTDA",
+            'nome_fantasia': f"Empresa {cnpj[:6]}",
+            'descricao_situacao_cadastral': 'ATIVA',
+            'cnae_fiscal': '0710301',
+            'cnae_fiscal_descricao': 'Extração de minério de ferro',
+            'ddd_telefone_1': '94',
+            'telefone_1': f"3{cnpj[:3]}{cnpj[3:7]}",
+            'email': f"fiscal{cnpj[:6]}@empresa.com.br",
+            'padding': self.padding()
+        })
+
+
+class ReceitaWsHandler(_Handler):
+    def route(self, path, query):
+        cnpj = path.rsplit('/', 1)[-1]
+        return 'application/json', json.dumps({
+            'status': 'OK',
+            'nome': f"EMPRESA {cnpj} LTDA",
+            'fantasia': f"Empresa {cnpj[:6]}",
+            'situacao': 'ATIVA',
+            'atividade_principal': [{'code': '07.10-3-01', 'text': 'Extração de minério de ferro'}],
+            'telefone': f"(94) 3{cnpj[:3]}-{cnpj[3:7]}",
+            'email': f"receita{cnpj[:6]}@empresa.com.br",
+            'padding': self.padding()
+        })
+
+
+class PublicaCnpjHandler(ReceitaWsHandler):
+    pass
+
+
+class CompanySiteHandler(_Handler):
+    """Imita sites de empresas com homepage e página de contato"""
+
+    def route(self, path, query):
+        if not path.startswith('/empresa-'):
+            return None
+        parts = path.strip('/').split('/')
+        company_id = parts[0].replace('empresa-', '')
+        nav = (
+            f"<nav><a href='/empresa-{company_id}/contato'>Contato</a>"
+            f"<a href='/empresa-{company_id}/sobre'>Sobre</a></nav>"
+        )
+        if len(parts) > 1:
+            # Página interna: o email só aparece em /contato, como em muitos sites reais
+            email = f"<a href='mailto:vendas{company_id[:5]}@empresa.com.br'>Email</a>" if parts[1] == 'contato' else ''
+            html = f"<html><body>{nav}{email}<div>{self.padding()}</div></body></html>"
+            return 'text/html', html
+        html = (
+            f"<html><body>{nav}"
+            f"<p>Fale conosco: (94) 9{company_id[:4]}-{company_id[4:8]}</p>"
+            f"<a href='https://www.facebook.com/empresa{company_id}'>Facebook</a>"
+            f"<a href='https://www.instagram.com/empresa{company_id}'>Instagram</a>"
+            f"<div>{self.padding()}</div></body></html>"
+        )
+        return 'text/html', html
+
+
+HANDLERS = {
+    'serp': SerpHandler,
+    'cnpj_biz': CnpjBizHandler,
+    'brasilapi': BrasilApiHandler,
+    'receitaws': ReceitaWsHandler,
+    'publica_cnpj': PublicaCnpjHandler,
+    'sites': CompanySiteHandler
+}
+
+
+class FakeServices:
+    """Sobe um servidor local por serviço externo, em threads"""
+
+    def __init__(self, profiles: Optional[Dict[str, ServiceProfile]] = None, seed: int = 42):
+        self.profiles = profiles or {}
+        self.seed = seed
+        self.servers: Dict[str, ThreadingHTTPServer] = {}
+        self.urls: Dict[str, str] = {}
+
+    def start(self) -> Dict[str, str]:
+        # Primeiro reserva as portas, pois os handlers precisam conhecer as URLs uns dos outros
+        for name in HANDLERS:
+            server = ThreadingHTTPServer(('127.0.0.1', 0), BaseHTTPRequestHandler)
+            server.daemon_threads = True
+            self.servers[name] = server
+            self.urls[name] = f"http://127.0.0.1:{server.server_address[1]}"
+
+        for name, handler in HANDLERS.items():
+            attrs = {
+                'profile': self.profiles.get(name, ServiceProfile()),
+                'services': self.urls,
+                'rng': random.Random(f"{self.seed}-{name}")
+            }
+            self.servers[name].RequestHandlerClass = type(handler.__name__, (handler,), attrs)
+            threading.Thread(target=self.servers[name].serve_forever, daemon=True).start()
+
+        return self.urls
+
+    def stop(self):
+        for server in self.servers.values():
+            server.shutdown()
+            server.server_close()
+        self.servers.clear()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
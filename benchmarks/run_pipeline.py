@@ -0,0 +1,189 @@
+"""Benchmark ponta a ponta do pipeline de busca + enriquecimento
+
+Executa contra os servidores locais de benchmarks/fake_services.py:
+
+    python -m benchmarks.run_pipeline --sizes 10,100,1000 --latency 0.02 --error-rate 0.05
+"""
+import argparse
+import json
+import math
+import os
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.fake_services import FakeServices, ServiceProfile
+from utils.data_enrichment import DataEnricher
+from utils.exporters import EXPORT_FORMATS
+from utils.leads import Lead, LeadStore
+from utils.metrics import PipelineMetrics
+from utils.scheduler import EnrichmentScheduler
+from utils.serp_client import SerpAPIClient, remove_duplicates
+
+# Limite de resultados por chamada da SERP API
+SERP_PAGE_SIZE = 100
+
+
+def configure_enricher(enricher: DataEnricher, urls: Dict[str, str]) -> DataEnricher:
+    """Aponta o enriquecedor para os serviços locais"""
+    enricher.CNPJ_BIZ_URL = urls['cnpj_biz']
+    enricher.CNPJ_API_URLS = [
+        f"{urls['brasilapi']}/api/cnpj/v1/{{cnpj}}",
+        f"{urls['receitaws']}/v1/cnpj/{{cnpj}}",
+        f"{urls['publica_cnpj']}/cnpj/{{cnpj}}"
+    ]
+    return enricher
+
+
+def measure_exports(store: LeadStore, export_dir: str) -> Dict:
+    """Tempo, tamanho e pico de memória de cada formato de exportação"""
+    results = {}
+    for name, (writer, extension, _) in EXPORT_FORMATS.items():
+        path = os.path.join(export_dir, f"leads_{len(store)}.{extension}")
+        tracemalloc.start()
+        start = time.perf_counter()
+        with open(path, 'wb') as f:
+            writer(store, f)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = {
+            'elapsed_s': round(elapsed, 3),
+            'size_kb': round(os.path.getsize(path) / 1024, 1),
+            'peak_memory_mb': round(peak / 1024 / 1024, 2)
+        }
+    return results
+
+
+def _execute(
+    size: int,
+    urls: Dict[str, str],
+    politeness: float,
+    hedge_percentile: Optional[float]
+) -> Tuple[LeadStore, PipelineMetrics, float]:
+    """Busca + enriquecimento pelo mesmo caminho do app (EnrichmentScheduler), com clientes e caches novos"""
+    metrics = PipelineMetrics()
+    serp_client = SerpAPIClient("benchmark", metrics=metrics, base_url=f"{urls['serp']}/search")
+    enricher = configure_enricher(DataEnricher(metrics=metrics, delay_range=(0, 0), provider_delay=0), urls)
+    # Todos os sites simulados estão no mesmo host, então a politeness por host serializaria o rastreamento
+    enricher.crawler_options = {'politeness_delay': politeness}
+    enricher.hedge_percentile = hedge_percentile
+
+    start = time.perf_counter()
+
+    results: List[Lead] = []
+    for page in range(math.ceil(size / SERP_PAGE_SIZE)):
+        num = min(SERP_PAGE_SIZE, size - page * SERP_PAGE_SIZE)
+        with metrics.stage('serp_search'):
+            results.extend(serp_client.search_local_businesses(f"benchmark {page}", num_results=num))
+
+    with metrics.stage('dedup'):
+        store = LeadStore(remove_duplicates(results))
+
+    with metrics.stage('enrichment'):
+        EnrichmentScheduler(enricher).run(store)
+
+    return store, metrics, time.perf_counter() - start
+
+
+def run_pipeline(
+    size: int,
+    urls: Dict[str, str],
+    politeness: float = 0.0,
+    export_dir: Optional[str] = None,
+    hedge_percentile: Optional[float] = None,
+    measure_memory: bool = True
+) -> Dict:
+    """Executa busca + enriquecimento para `size` empresas e mede o resultado
+
+    Tempos vêm de uma execução sem rastreamento de alocações; o pico de memória,
+    de uma segunda execução sob tracemalloc (que deixa o pipeline bem mais lento).
+    """
+    store, metrics, elapsed = _execute(size, urls, politeness, hedge_percentile)
+
+    peak = None
+    if measure_memory:
+        tracemalloc.start()
+        _execute(size, urls, politeness, hedge_percentile)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    report = metrics.to_dict()
+    company_stage = report['stages'].get('enrich_company', {})
+    exports = measure_exports(store, export_dir) if export_dir else None
+    return {
+        'size': size,
+        'companies': len(store),
+        'elapsed_s': round(elapsed, 3),
+        'companies_per_s': round(len(store) / elapsed, 2) if elapsed else None,
+        'p50_company_s': company_stage.get('p50_s'),
+        'p95_company_s': company_stage.get('p95_s'),
+        'peak_memory_mb': round(peak / 1024 / 1024, 2) if peak is not None else None,
+        'requests': sum(h['requests'] for h in report['hosts'].values()),
+        'errors': report['errors'],
+        'exports': exports,
+        'metrics': report
+    }
+
+
+def _format_row(row: Dict) -> str:
+    def fmt(value, spec):
+        return format(value, spec) if value is not None else '-'
+    return (
+        f"{row['size']:>7} {row['companies']:>9} {row['elapsed_s']:>10.2f} "
+        f"{fmt(row['companies_per_s'], '>10.2f')} {fmt(row['p50_company_s'], '>9.4f')} "
+        f"{fmt(row['p95_company_s'], '>9.4f')} {fmt(row['peak_memory_mb'], '>10.2f')}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline contra serviços locais simulados")
+    parser.add_argument('--sizes', default='10,100,1000,10000', help="quantidades de leads, separadas por vírgula")
+    parser.add_argument('--latency', type=float, default=0.02, help="latência média dos serviços (s)")
+    parser.add_argument('--jitter', type=float, default=0.01, help="variação da latência (s)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fração de respostas HTTP 500")
+    parser.add_argument('--page-size', type=int, default=20000, help="bytes extras por página de site")
+    parser.add_argument('--politeness', type=float, default=0.0, help="intervalo mínimo entre requisições ao mesmo site (s)")
+    parser.add_argument('--cnpj-slow-rate', type=float, default=0.0,
+                        help="fração de respostas lentas do primeiro provedor de CNPJ (BrasilAPI)")
+    parser.add_argument('--cnpj-slow-latency', type=float, default=5.0, help="atraso extra dessas respostas (s)")
+    parser.add_argument('--hedge', type=float, help="percentil de latência para hedging das consultas de CNPJ (ex.: 95)")
+    parser.add_argument('--export-dir', help="também mede a exportação (CSV gzip, Excel, Parquet) gravando neste diretório")
+    parser.add_argument('--no-memory', action='store_true', help="pula a execução extra que mede o pico de memória")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', dest='json_path', help="grava o relatório completo em JSON")
+    args = parser.parse_args()
+
+    api_profile = ServiceProfile(args.latency, args.jitter, args.error_rate, page_size=0)
+    profiles = {
+        'serp': ServiceProfile(args.latency, args.jitter, args.error_rate, page_size=0),
+        'cnpj_biz': ServiceProfile(args.latency, args.jitter, args.error_rate, page_size=args.page_size),
+        'brasilapi': ServiceProfile(
+            args.latency, args.jitter, args.error_rate, page_size=0,
+            slow_rate=args.cnpj_slow_rate, slow_latency=args.cnpj_slow_latency
+        ),
+        'receitaws': api_profile,
+        'publica_cnpj': api_profile,
+        'sites': ServiceProfile(args.latency, args.jitter, args.error_rate, page_size=args.page_size)
+    }
+
+    rows = []
+    print(f"{'leads':>7} {'empresas':>9} {'tempo (s)':>10} {'emp/s':>10} {'p50 (s)':>9} {'p95 (s)':>9} {'pico (MB)':>10}")
+    with FakeServices(profiles, seed=args.seed) as services:
+        for size in (int(s) for s in args.sizes.split(',') if s.strip()):
+            row = run_pipeline(
+                size, services.urls, args.politeness, args.export_dir, args.hedge,
+                measure_memory=not args.no_memory
+            )
+            rows.append(row)
+            print(_format_row(row), flush=True)
+            for name, export in (row['exports'] or {}).items():
+                print(f"{'':>7} {name}: {export['elapsed_s']:.2f} s, {export['size_kb']:.1f} KB, pico {export['peak_memory_mb']:.2f} MB")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'runs': rows}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+import pytest
+
+from utils.contact_extractor import ContactExtractor, normalize_phone
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("(94) 3346-1000", "+559433461000"),
+    ("94 99123-4567", "+5594991234567"),
+    ("+55 (91) 98888-7777", "+5591988887777"),
+    ("(94) 9123-4567", "+5594991234567"),      # celular antigo de 8 dígitos recebe o nono dígito
+    ("(94) 8123-4567", "+5594981234567"),
+    ("(20) 3346-1000", None),                  # DDD inexistente
+    ("(10) 99123-4567", None),
+    ("(94) 1346-1000", None),                  # fixo começa com 2-5
+    ("(94) 89123-4567", None),                 # nove dígitos sem o 9 inicial
+    ("3346-1000", None),                       # sem DDD
+])
+def test_normalize_phone(raw, expected):
+    assert normalize_phone(raw) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('<a href="tel:9433461000">Ligue</a>', ["+559433461000"]),
+    ('<a href="tel:+55-94-3346-1000">Ligue</a>', ["+559433461000"]),
+    ('<a href="tel:+55 94 3346-1000">Ligue</a>', ["+559433461000"]),
+    ('<a href="https://wa.me/5594991234567">WhatsApp</a>', ["+5594991234567"]),
+    ('https://api.whatsapp.com/send?phone=5594988887777&text=Olá', ["+5594988887777"]),
+    ('Fale conosco: (94) 3346-1000 ou (94) 99123-4567', ["+559433461000", "+5594991234567"]),
+    ('Pedido 9433461000 registrado em 1712345678901', []),
+])
+def test_extract_phones(text, expected):
+    assert ContactExtractor().extract(text)['phones'] == expected
+
+
+def test_extract_deduplicates_and_ignores_image_names():
+    text = (
+        'vendas@mineradora.com.br <img src="logo@2x.png"> VENDAS@mineradora.com.br '
+        'tel:9433461000 (94) 3346-1000'
+    )
+    assert ContactExtractor().extract(text) == {
+        'emails': ['vendas@mineradora.com.br'],
+        'phones': ['+559433461000']
+    }
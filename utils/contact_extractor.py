@@ -0,0 +1,96 @@
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# DDDs válidos no Brasil (Anatel)
+VALID_DDDS = {
+    11, 12, 13, 14, 15, 16, 17, 18, 19,
+    21, 22, 24, 27, 28,
+    31, 32, 33, 34, 35, 37, 38,
+    41, 42, 43, 44, 45, 46, 47, 48, 49,
+    51, 53, 54, 55,
+    61, 62, 63, 64, 65, 66, 67, 68, 69,
+    71, 73, 74, 75, 77, 79,
+    81, 82, 83, 84, 85, 86, 87, 88, 89,
+    91, 92, 93, 94, 95, 96, 97, 98, 99
+}
+
+# Extensões que aparecem em nomes de arquivo do tipo "logo@2x.png"
+IGNORED_EMAIL_SUFFIXES = ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp')
+
+# Email e telefone em uma única alternância, para percorrer o texto uma só vez.
+# Em links tel:, wa.me/ e phone= (WhatsApp) o número costuma vir só em dígitos e é aceito assim.
+CONTACT_PATTERN = re.compile(
+    r'(?P<email>\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b)'
+    r'|(?:(?i:tel:)|wa\.me/|phone=)(?:%2B|\+)?(?P<link_phone>\d[\d().-]{6,18}\d)'
+    r'|(?P<phone>(?<![\d\w])(?:\+?55[\s.-]*)?(?:\(\s*\d{2}\s*\)|\d{2})[\s.-]*(?:9[\s.]?)?\d{4}[\s.-]?\d{4}(?!\d))'
+)
+
+CNPJ_PATTERN = re.compile(r'(\d{2}\.?\d{3}\.?\d{3}\/?\d{4}-?\d{2})')
+
+PARTNER_PATTERN = re.compile(r'(?:Sócio|Administrador|Diretor)[:\s]*([^\n\r]+)', re.IGNORECASE)
+
+
+def normalize_phone(raw: str) -> Optional[str]:
+    """Normaliza um telefone brasileiro para E.164 (+55DDNNNNNNNN), ou None se inválido"""
+    digits = re.sub(r'\D', '', raw)
+    if len(digits) in (12, 13) and digits.startswith('55'):
+        digits = digits[2:]
+    if len(digits) not in (10, 11):
+        return None
+
+    ddd, number = int(digits[:2]), digits[2:]
+    if ddd not in VALID_DDDS:
+        return None
+
+    if len(number) == 9:
+        # Celulares têm nove dígitos e começam com 9
+        if number[0] != '9':
+            return None
+    elif number[0] in '6789':
+        # Celular no formato antigo de oito dígitos: recebe o nono dígito
+        number = '9' + number
+    elif number[0] not in '2345':
+        return None
+
+    return f"+55{digits[:2]}{number}"
+
+
+class ContactExtractor:
+    """Extrai emails e telefones de um texto em uma única varredura"""
+
+    def iter_contacts(self, text: str) -> Iterator[Tuple[str, str]]:
+        """Gera pares ('email' | 'phone', valor normalizado) na ordem do texto"""
+        for match in CONTACT_PATTERN.finditer(text):
+            email = match.group('email')
+            if email:
+                email = email.lower()
+                if not email.endswith(IGNORED_EMAIL_SUFFIXES):
+                    yield 'email', email
+                continue
+
+            raw = match.group('link_phone')
+            if raw is None:
+                raw = match.group('phone')
+                # Fora de links, sequências só de dígitos (ids, timestamps) não contam
+                if raw.isdigit():
+                    continue
+            phone = normalize_phone(raw)
+            if phone:
+                yield 'phone', phone
+
+    def extract(self, text: str) -> Dict[str, List[str]]:
+        """Emails e telefones sem duplicatas, na ordem em que aparecem"""
+        found = {'email': {}, 'phone': {}}
+        for kind, value in self.iter_contacts(text):
+            found[kind].setdefault(value, None)
+        return {'emails': list(found['email']), 'phones': list(found['phone'])}
+
+
+def extract_partners(text: str) -> List[str]:
+    """Sócios, administradores e diretores citados em uma página de CNPJ"""
+    partners = {}
+    for match in PARTNER_PATTERN.finditer(text):
+        partner = match.group(1).strip()
+        if len(partner) > 3:
+            partners.setdefault(partner, None)
+    return list(partners)
@@ -1,302 +1,490 @@
-import requests
-import time
-import random
-import re
-from typing import List, Dict, Optional
-from bs4 import BeautifulSoup
-import streamlit as st
-
-class DataEnricher:
-    """Classe para enriquecimento de dados das empresas"""
-    
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
-    
-    def enrich_companies(
-        self, 
-        companies: List[Dict], 
-        include_cnpj: bool = True,
-        include_contacts: bool = True,
-        progress_callback=None
-    ) -> List[Dict]:
-        """Enriquece dados das empresas"""
-        
-        enriched_companies = []
-        total = len(companies)
-        
-        for i, company in enumerate(companies):
-            try:
-                enriched_company = company.copy()
-                
-                # Enriquecimento via CNPJ
-                if include_cnpj:
-                    cnpj_data = self._search_cnpj_data(company.get('name', ''))
-                    if cnpj_data:
-                        enriched_company.update(cnpj_data)
-                
-                # Enriquecimento de contatos
-                if include_contacts:
-                    website = company.get('website')
-                    if website and isinstance(website, str):
-                        contact_data = self._extract_contacts_from_website(website)
-                        if contact_data:
-                            enriched_company.update(contact_data)
-                        
-                        # Busca redes sociais
-                        social_data = self._extract_social_media(website)
-                        if social_data:
-                            enriched_company['social_media'] = social_data
-                
-                enriched_companies.append(enriched_company)
-                
-                # Callback de progresso
-                if progress_callback:
-                    progress_callback((i + 1) / total)
-                
-                # Delay anti-bloqueio
-                time.sleep(random.uniform(1, 3))
-                
-            except Exception as e:
-                # Em caso de erro, mantém os dados originais
-                enriched_companies.append(company)
-                continue
-        
-        return enriched_companies
-    
-    def _search_cnpj_data(self, company_name: str) -> Optional[Dict]:
-        """Busca dados de CNPJ usando APIs públicas"""
-        if not company_name:
-            return None
-        
-        # Tenta encontrar CNPJ via cnpj.biz
-        cnpj_data = self._search_cnpj_biz(company_name)
-        if cnpj_data and cnpj_data.get('cnpj'):
-            # Se encontrou CNPJ, busca mais detalhes nas APIs oficiais
-            official_data = self._get_cnpj_official_data(cnpj_data['cnpj'])
-            if official_data:
-                cnpj_data.update(official_data)
-        
-        return cnpj_data
-    
-    def _search_cnpj_biz(self, company_name: str) -> Optional[Dict]:
-        """Busca CNPJ no site cnpj.biz"""
-        try:
-            # Limpa o nome da empresa para busca
-            query = re.sub(r'[^\w\s]', ' ', company_name).strip()
-            query = re.sub(r'\s+', '+', query)
-            
-            url = f"https://cnpj.biz/search/{query}"
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, "html.parser")
-            
-            # Procura links para páginas de empresas
-            empresa_links = []
-            for link in soup.find_all("a", href=True):
-                href = link.get("href", "")
-                if "/cnpj/" in href:
-                    from urllib.parse import urljoin
-                    full_url = urljoin("https://cnpj.biz", href)
-                    empresa_links.append(full_url)
-            
-            if not empresa_links:
-                return None
-            
-            # Acessa a primeira empresa encontrada
-            detail_response = self.session.get(empresa_links[0], timeout=15)
-            detail_response.raise_for_status()
-            
-            detail_soup = BeautifulSoup(detail_response.text, "html.parser")
-            page_text = detail_soup.get_text()
-            
-            # Extrai CNPJ
-            cnpj_match = re.search(r'(\d{2}\.?\d{3}\.?\d{3}\/?\d{4}-?\d{2})', page_text)
-            cnpj = cnpj_match.group(1) if cnpj_match else None
-            
-            # Extrai sócios
-            socios_patterns = [
-                r'Sócio[:\s]*([^\n\r]+)',
-                r'Administrador[:\s]*([^\n\r]+)',
-                r'Diretor[:\s]*([^\n\r]+)'
-            ]
-            socios = []
-            for pattern in socios_patterns:
-                matches = re.findall(pattern, page_text, re.IGNORECASE)
-                for match in matches:
-                    match = match.strip()
-                    if match and len(match) > 3:
-                        socios.append(match)
-            
-            # Remove duplicatas
-            socios = list(set(socios))
-            
-            # Extrai email
-            email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', page_text)
-            email = email_match.group(0).lower() if email_match else None
-            
-            return {
-                'cnpj': cnpj,
-                'socios': ', '.join(socios) if socios else None,
-                'email_cnpj': email
-            }
-            
-        except Exception:
-            return None
-    
-    def _get_cnpj_official_data(self, cnpj: str) -> Optional[Dict]:
-        """Busca dados oficiais do CNPJ em APIs públicas"""
-        if not cnpj:
-            return None
-        
-        # Limpa CNPJ
-        cnpj_limpo = re.sub(r'\D', '', cnpj)
-        if len(cnpj_limpo) != 14:
-            return None
-        
-        # Lista de APIs para tentar
-        apis = [
-            f"https://brasilapi.com.br/api/cnpj/v1/{cnpj_limpo}",
-            f"https://www.receitaws.com.br/v1/cnpj/{cnpj_limpo}",
-            f"https://publica.cnpj.ws/cnpj/{cnpj_limpo}"
-        ]
-        
-        for api_url in apis:
-            try:
-                response = self.session.get(api_url, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # BrasilAPI format
-                    if 'razao_social' in data:
-                        return {
-                            'razao_social': data.get('razao_social'),
-                            'nome_fantasia': data.get('nome_fantasia'),
-                            'situacao_cadastral': data.get('descricao_situacao_cadastral'),
-                            'cnae_principal': f"{data.get('cnae_fiscal', '')} - {data.get('cnae_fiscal_descricao', '')}",
-                            'telefone_oficial': self._format_phone(data.get('ddd_telefone_1'), data.get('telefone_1')),
-                            'email_oficial': data.get('email', '').lower() if data.get('email') else None
-                        }
-                    
-                    # ReceitaWS format
-                    elif 'nome' in data and data.get('status') != 'ERROR':
-                        cnae_principal = data.get('atividade_principal', [{}])[0]
-                        return {
-                            'razao_social': data.get('nome'),
-                            'nome_fantasia': data.get('fantasia'),
-                            'situacao_cadastral': data.get('situacao'),
-                            'cnae_principal': f"{cnae_principal.get('code', '')} - {cnae_principal.get('text', '')}",
-                            'telefone_oficial': data.get('telefone'),
-                            'email_oficial': data.get('email', '').lower() if data.get('email') else None
-                        }
-                
-                # Delay entre tentativas
-                time.sleep(1)
-                
-            except Exception:
-                continue
-        
-        return None
-    
-    def _format_phone(self, ddd, phone):
-        """Formata telefone com DDD"""
-        if ddd and phone:
-            return f"({ddd}) {phone}"
-        return None
-    
-    def _extract_contacts_from_website(self, website: str) -> Optional[Dict]:
-        """Extrai contatos do website da empresa"""
-        if not website or not website.startswith('http'):
-            return None
-        
-        try:
-            response = self.session.get(website, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, "html.parser")
-            page_text = response.text
-            
-            contacts = {}
-            
-            # Busca emails
-            email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-            emails = re.findall(email_pattern, page_text)
-            
-            # Filtra emails válidos (remove imagens, etc.)
-            valid_emails = []
-            for email in emails:
-                email_lower = email.lower()
-                if not email_lower.endswith(('.png', '.jpg', '.jpeg', '.gif', '.svg')):
-                    valid_emails.append(email_lower)
-            
-            if valid_emails:
-                contacts['emails_website'] = ', '.join(list(set(valid_emails)))
-            
-            # Busca links mailto
-            for a_tag in soup.find_all("a", href=True):
-                href = a_tag.get("href", "")
-                if href.startswith("mailto:"):
-                    email = href.replace("mailto:", "").strip().lower()
-                    if email:
-                        if 'emails_website' in contacts:
-                            contacts['emails_website'] += f", {email}"
-                        else:
-                            contacts['emails_website'] = email
-            
-            # Busca telefones adicionais
-            phone_patterns = [
-                r'\(\d{2}\)\s*\d{4,5}-?\d{4}',  # (11) 9999-9999
-                r'\d{2}\s*\d{4,5}-?\d{4}',      # 11 9999-9999
-                r'\+55\s*\d{2}\s*\d{4,5}-?\d{4}' # +55 11 9999-9999
-            ]
-            
-            for pattern in phone_patterns:
-                phones = re.findall(pattern, page_text)
-                if phones:
-                    contacts['telefones_website'] = ', '.join(list(set(phones)))
-                    break
-            
-            return contacts if contacts else None
-            
-        except Exception:
-            return None
-    
-    def _extract_social_media(self, website: str) -> Optional[str]:
-        """Extrai links de redes sociais do website"""
-        if not website or not website.startswith('http'):
-            return None
-        
-        try:
-            response = self.session.get(website, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, "html.parser")
-            
-            social_links = {}
-            
-            for a_tag in soup.find_all("a", href=True):
-                href_attr = a_tag.get("href", "")
-                if href_attr:
-                    href = href_attr.lower()
-                    
-                    if 'facebook.com' in href and not social_links.get('facebook'):
-                        social_links['facebook'] = href_attr
-                    elif 'instagram.com' in href and not social_links.get('instagram'):
-                        social_links['instagram'] = href_attr
-                    elif 'linkedin.com' in href and not social_links.get('linkedin'):
-                        social_links['linkedin'] = href_attr
-                    elif 'twitter.com' in href and not social_links.get('twitter'):
-                        social_links['twitter'] = href_attr
-                    elif 'youtube.com' in href and not social_links.get('youtube'):
-                        social_links['youtube'] = href_attr
-            
-            if social_links:
-                return ', '.join([f"{k.title()}: {v}" for k, v in social_links.items()])
-            
-            return None
-            
-        except Exception:
-            return None
+import requests
+import time
+import random
+import re
+import copy
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
+from urllib.parse import urlparse
+from bs4 import BeautifulSoup
+
+from utils.contact_extractor import CNPJ_PATTERN, ContactExtractor, extract_partners
+from utils.leads import Lead, LeadStore
+from utils.metrics import PipelineMetrics, timed_get
+from utils.shared_cache import SharedCache, cached_call
+from utils.site_crawler import ContactCrawler, website_key
+
+# Amostras de latência do provedor necessárias antes de usar o percentil como limiar de hedging
+HEDGE_MIN_SAMPLES = 5
+
+class DataEnricher:
+    """Classe para enriquecimento de dados das empresas"""
+    
+    # Endereços dos serviços consultados (sobrescrevíveis, ex.: benchmarks locais)
+    CNPJ_BIZ_URL = "https://cnpj.biz"
+    CNPJ_API_URLS = [
+        "https://brasilapi.com.br/api/cnpj/v1/{cnpj}",
+        "https://www.receitaws.com.br/v1/cnpj/{cnpj}",
+        "https://publica.cnpj.ws/cnpj/{cnpj}"
+    ]
+    
+    def __init__(
+        self,
+        metrics: Optional[PipelineMetrics] = None,
+        delay_range: Tuple[float, float] = (1, 3),
+        provider_delay: float = 1,
+        cache: Optional[SharedCache] = None,
+        page_cache: Optional[SharedCache] = None,
+        hedge_percentile: Optional[float] = None,
+        hedge_delay: float = 2.0,
+        max_hedged_requests: int = 50
+    ):
+        self.metrics = metrics
+        self.delay_range = delay_range
+        self.provider_delay = provider_delay
+        self.contact_extractor = ContactExtractor()
+        # Parâmetros repassados ao ContactCrawler (orçamento de páginas, profundidade, politeness)
+        self.crawler_options: Dict = {}
+        # Consultas de CNPJ (compartilháveis entre sessões) e HTML de páginas, com limite menor
+        self.cache = cache or SharedCache()
+        self.page_cache = page_cache or SharedCache(max_entries=256, ttl=900)
+        # Hedging das APIs de CNPJ: se o provedor não responder dentro do percentil `hedge_percentile`
+        # da sua latência (limitado a `hedge_delay`, usado também sem histórico), o próximo é
+        # consultado em paralelo. None desativa; `max_hedged_requests` limita as consultas extras por execução.
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        self.max_hedged_requests = max_hedged_requests
+        self.hedged_requests = 0
+        self.session = requests.Session()
+        # Pool maior: páginas de contato são baixadas em paralelo
+        adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        })
+    
+    def enrich_companies(
+        self, 
+        companies: List[Dict], 
+        include_cnpj: bool = True,
+        include_contacts: bool = True,
+        progress_callback=None,
+        crawl_contact_pages: bool = True
+    ) -> List[Dict]:
+        """Enriquece dados das empresas"""
+        
+        enriched_companies = []
+        for company, delta in zip(companies, self.iter_enrichment(
+            companies, include_cnpj, include_contacts, progress_callback, crawl_contact_pages
+        )):
+            base = company.to_dict() if isinstance(company, Lead) else company.copy()
+            base.update(delta or {})
+            enriched_companies.append(base)
+        
+        return enriched_companies
+    
+    def enrich_store(
+        self,
+        store: LeadStore,
+        include_cnpj: bool = True,
+        include_contacts: bool = True,
+        progress_callback=None,
+        crawl_contact_pages: bool = True
+    ) -> LeadStore:
+        """Enriquece os leads do store, guardando só os campos novos de cada um"""
+        for i, delta in enumerate(self.iter_enrichment(
+            store.leads, include_cnpj, include_contacts, progress_callback, crawl_contact_pages
+        )):
+            store.set_enrichment(i, delta or {})
+        
+        return store
+    
+    def iter_enrichment(
+        self,
+        companies: Iterable[Dict],
+        include_cnpj: bool = True,
+        include_contacts: bool = True,
+        progress_callback=None,
+        crawl_contact_pages: bool = True,
+        total: Optional[int] = None
+    ) -> Iterator[Optional[Dict]]:
+        """Gera, em ordem, os campos obtidos no enriquecimento de cada empresa
+        
+        Gera None quando o enriquecimento da empresa falhou, para distinguir de uma
+        empresa enriquecida sem dados novos ({}). Quem consome pode parar entre
+        empresas: a próxima só é processada quando pedida.
+        """
+        
+        total = len(companies) if total is None else total
+        
+        # Rastreador de páginas de contato (/contato, /fale-conosco...) desta execução
+        crawler = ContactCrawler(self, **self.crawler_options) if include_contacts and crawl_contact_pages else None
+        
+        # Resultado por site (website_key): filiais que compartilham o site são analisadas uma vez
+        website_results: Dict[str, Dict] = {}
+        
+        for i, company in enumerate(companies):
+            company_start = time.perf_counter()
+            delta = {}
+            try:
+                # Enriquecimento via CNPJ
+                if include_cnpj:
+                    cnpj_data = self._search_cnpj_data(company.get('name', ''))
+                    if cnpj_data:
+                        delta.update(cnpj_data)
+                
+                # Enriquecimento de contatos
+                if include_contacts:
+                    website = company.get('website')
+                    if website and isinstance(website, str):
+                        domain = website_key(website)
+                        if domain in website_results:
+                            if self.metrics:
+                                self.metrics.record_cache('website_domain', hit=True)
+                                self.metrics.increment('website_fetches_deduplicated')
+                        else:
+                            if self.metrics:
+                                self.metrics.record_cache('website_domain', hit=False)
+                            website_results[domain] = self._enrich_website(website, crawler)
+                        delta.update(website_results[domain])
+                
+                if self.metrics:
+                    self.metrics.observe_stage('enrich_company', time.perf_counter() - company_start)
+                
+            except Exception:
+                # Em caso de erro, mantém os dados originais e sinaliza a falha
+                if self.metrics:
+                    self.metrics.record_error('enrich_company')
+                delta = None
+            
+            yield delta
+            
+            # Callback de progresso
+            if progress_callback:
+                progress_callback((i + 1) / total)
+            
+            # Delay anti-bloqueio
+            if self.delay_range[1] > 0:
+                with self._stage('sleep'):
+                    time.sleep(random.uniform(*self.delay_range))
+    
+    def _enrich_website(self, website: str, crawler: Optional[ContactCrawler] = None) -> Dict:
+        """Contatos e redes sociais de um site (a homepage é analisada uma única vez)"""
+        website_data = {}
+        if not website or not website.startswith('http'):
+            return website_data
+        
+        html = crawler.fetch(website) if crawler else self.fetch_page(website)
+        if html is None:
+            return website_data
+        
+        try:
+            with self._stage('website_parse'):
+                soup = BeautifulSoup(html, "html.parser")
+                contact_data = None if crawler else self._parse_contacts(html)
+        except Exception:
+            return website_data
+        
+        if crawler:
+            contact_data = crawler.crawl(website, html, soup)
+        if contact_data:
+            website_data.update(contact_data)
+        
+        # Busca redes sociais na mesma árvore
+        social_data = self._extract_social_media(soup)
+        if social_data:
+            website_data['social_media'] = social_data
+        
+        return website_data
+    
+    def for_run(self, metrics: Optional[PipelineMetrics] = None) -> "DataEnricher":
+        """Visão por execução que compartilha sessão HTTP e caches, com métricas próprias"""
+        run_enricher = copy.copy(self)
+        run_enricher.metrics = metrics
+        run_enricher.hedged_requests = 0
+        return run_enricher
+    
+    def _stage(self, name: str):
+        """Context manager de medição do estágio (no-op sem métricas)"""
+        return self.metrics.stage(name) if self.metrics else nullcontext()
+    
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """GET instrumentado pela sessão compartilhada"""
+        return timed_get(self.session, url, self.metrics, **kwargs)
+    
+    def fetch_page(self, url: str) -> Optional[str]:
+        """Baixa o HTML de uma página, reaproveitando downloads recentes (inclusive de outras sessões)"""
+        return cached_call(self.page_cache, self.metrics, 'website_page', url, lambda: self._download_page(url))
+    
+    def _download_page(self, url: str) -> Optional[str]:
+        try:
+            with self._stage('website_fetch'):
+                response = self._get(url, timeout=10)
+            response.raise_for_status()
+            return response.text
+        except Exception:
+            return None
+    
+    def _search_cnpj_data(self, company_name: str) -> Optional[Dict]:
+        """Busca dados de CNPJ usando APIs públicas"""
+        if not company_name:
+            return None
+        
+        # Tenta encontrar CNPJ via cnpj.biz
+        query = ' '.join(company_name.lower().split())
+        cnpj_data = cached_call(
+            self.cache, self.metrics, 'cnpj_biz', query, lambda: self._search_cnpj_biz(company_name)
+        )
+        if cnpj_data and cnpj_data.get('cnpj'):
+            # Se encontrou CNPJ, busca mais detalhes nas APIs oficiais
+            cnpj = cnpj_data['cnpj']
+            official_data = cached_call(
+                self.cache, self.metrics, 'cnpj_official', re.sub(r'\D', '', cnpj),
+                lambda: self._get_cnpj_official_data(cnpj)
+            )
+            if official_data:
+                # Novo dict: os resultados em cache não podem ser alterados
+                cnpj_data = {**cnpj_data, **official_data}
+        
+        return cnpj_data
+    
+    def _search_cnpj_biz(self, company_name: str) -> Optional[Dict]:
+        """Busca CNPJ no site cnpj.biz"""
+        try:
+            # Limpa o nome da empresa para busca
+            query = re.sub(r'[^\w\s]', ' ', company_name).strip()
+            query = re.sub(r'\s+', '+', query)
+            
+            url = f"{self.CNPJ_BIZ_URL}/search/{query}"
+            with self._stage('cnpj_biz_search'):
+                response = self._get(url, timeout=15)
+            response.raise_for_status()
+            
+            with self._stage('cnpj_biz_parse'):
+                soup = BeautifulSoup(response.text, "html.parser")
+                
+                # Procura links para páginas de empresas
+                empresa_links = []
+                for link in soup.find_all("a", href=True):
+                    href = link.get("href", "")
+                    if "/cnpj/" in href:
+                        from urllib.parse import urljoin
+                        full_url = urljoin(self.CNPJ_BIZ_URL, href)
+                        empresa_links.append(full_url)
+            
+            if not empresa_links:
+                return None
+            
+            # Acessa a primeira empresa encontrada
+            with self._stage('cnpj_biz_detail'):
+                detail_response = self._get(empresa_links[0], timeout=15)
+            detail_response.raise_for_status()
+            
+            with self._stage('cnpj_biz_parse'):
+                detail_soup = BeautifulSoup(detail_response.text, "html.parser")
+                page_text = detail_soup.get_text()
+            
+            # Extrai CNPJ
+            cnpj_match = CNPJ_PATTERN.search(page_text)
+            cnpj = cnpj_match.group(1) if cnpj_match else None
+            
+            # Extrai sócios (sem duplicatas)
+            socios = extract_partners(page_text)
+            
+            # Extrai o primeiro email da página
+            email = next(
+                (value for kind, value in self.contact_extractor.iter_contacts(page_text) if kind == 'email'),
+                None
+            )
+            
+            return {
+                'cnpj': cnpj,
+                'socios': ', '.join(socios) if socios else None,
+                'email_cnpj': email
+            }
+            
+        except Exception:
+            return None
+    
+    def _get_cnpj_official_data(self, cnpj: str) -> Optional[Dict]:
+        """Busca dados oficiais do CNPJ em APIs públicas"""
+        if not cnpj:
+            return None
+        
+        # Limpa CNPJ
+        cnpj_limpo = re.sub(r'\D', '', cnpj)
+        if len(cnpj_limpo) != 14:
+            return None
+        
+        # Lista de APIs para tentar
+        apis = [template.format(cnpj=cnpj_limpo) for template in self.CNPJ_API_URLS]
+        
+        if self.hedge_percentile is not None:
+            return self._hedged_cnpj_lookup(apis)
+        
+        for attempt, api_url in enumerate(apis):
+            if attempt:
+                self._provider_fallback()
+            data = self._query_cnpj_api(api_url)
+            if data:
+                return data
+        
+        return None
+    
+    def _hedged_cnpj_lookup(self, apis: List[str]) -> Optional[Dict]:
+        """Consulta os provedores em ordem, disparando o próximo em paralelo quando o atual demora
+        
+        A primeira resposta válida vence; consultas ainda na fila são canceladas e as em andamento, ignoradas.
+        """
+        executor = ThreadPoolExecutor(max_workers=len(apis), thread_name_prefix='cnpj-hedge')
+        # Consulta em andamento -> se foi disparada como hedge
+        pending: Dict[Future, bool] = {}
+        next_index = 0
+        deadline = None
+        
+        def launch(hedge: bool) -> float:
+            nonlocal next_index
+            api_url = apis[next_index]
+            next_index += 1
+            pending[executor.submit(self._query_cnpj_api, api_url)] = hedge
+            return time.monotonic() + self._hedge_threshold(api_url)
+        
+        try:
+            while True:
+                if not pending:
+                    if next_index == len(apis):
+                        return None
+                    if next_index:
+                        self._provider_fallback()
+                    deadline = launch(hedge=False)
+                
+                can_hedge = next_index < len(apis) and self.hedged_requests < self.max_hedged_requests
+                timeout = max(0.0, deadline - time.monotonic()) if can_hedge else None
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                
+                if not done:
+                    # Sem resposta dentro do limiar: consulta o próximo provedor em paralelo
+                    self.hedged_requests += 1
+                    if self.metrics:
+                        self.metrics.increment('cnpj_hedged_requests')
+                    deadline = launch(hedge=True)
+                    continue
+                
+                for future in done:
+                    hedge = pending.pop(future)
+                    data = future.result()
+                    if data:
+                        if hedge and self.metrics:
+                            self.metrics.increment('cnpj_hedge_wins')
+                        return data
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _hedge_threshold(self, api_url: str) -> float:
+        """Tempo de espera pelo provedor antes de disparar o hedge"""
+        observed = None
+        if self.metrics:
+            observed = self.metrics.host_percentile(
+                urlparse(api_url).netloc, self.hedge_percentile, min_samples=HEDGE_MIN_SAMPLES
+            )
+        # Respostas lentas entram no histórico; o teto impede que uma cauda longa desative o hedge
+        return min(observed, self.hedge_delay) if observed is not None else self.hedge_delay
+    
+    def _provider_fallback(self):
+        """Registra e espaça a consulta ao próximo provedor após uma falha"""
+        if self.metrics:
+            # Cada provedor adicional consultado conta como nova tentativa
+            self.metrics.record_retry('cnpj_provider_fallback')
+        if self.provider_delay > 0:
+            with self._stage('sleep'):
+                time.sleep(self.provider_delay)
+    
+    def _query_cnpj_api(self, api_url: str) -> Optional[Dict]:
+        """Consulta um provedor de CNPJ e normaliza a resposta"""
+        try:
+            with self._stage(f"cnpj_api:{urlparse(api_url).netloc}"):
+                response = self._get(api_url, timeout=10)
+            if response.status_code != 200:
+                return None
+            data = response.json()
+            
+            # BrasilAPI format
+            if 'razao_social' in data:
+                return {
+                    'razao_social': data.get('razao_social'),
+                    'nome_fantasia': data.get('nome_fantasia'),
+                    'situacao_cadastral': data.get('descricao_situacao_cadastral'),
+                    'cnae_principal': f"{data.get('cnae_fiscal', '')} - {data.get('cnae_fiscal_descricao', '')}",
+                    'telefone_oficial': self._format_phone(data.get('ddd_telefone_1'), data.get('telefone_1')),
+                    'email_oficial': data.get('email', '').lower() if data.get('email') else None
+                }
+            
+            # ReceitaWS format
+            elif 'nome' in data and data.get('status') != 'ERROR':
+                cnae_principal = data.get('atividade_principal', [{}])[0]
+                return {
+                    'razao_social': data.get('nome'),
+                    'nome_fantasia': data.get('fantasia'),
+                    'situacao_cadastral': data.get('situacao'),
+                    'cnae_principal': f"{cnae_principal.get('code', '')} - {cnae_principal.get('text', '')}",
+                    'telefone_oficial': data.get('telefone'),
+                    'email_oficial': data.get('email', '').lower() if data.get('email') else None
+                }
+            
+        except ValueError:
+            # Resposta não é JSON válido
+            if self.metrics:
+                self.metrics.record_error('parse')
+        except Exception:
+            pass
+        
+        return None
+    
+    def _format_phone(self, ddd, phone):
+        """Formata telefone com DDD"""
+        if ddd and phone:
+            return f"({ddd}) {phone}"
+        return None
+    
+    def _parse_contacts(self, html: str) -> Optional[Dict]:
+        """Extrai emails (inclusive de links mailto) e telefones do HTML de uma página"""
+        found = self.contact_extractor.extract(html)
+        
+        contacts = {}
+        if found['emails']:
+            contacts['emails_website'] = ', '.join(found['emails'])
+        if found['phones']:
+            contacts['telefones_website'] = ', '.join(found['phones'])
+        
+        return contacts if contacts else None
+    
+    def _extract_social_media(self, soup: BeautifulSoup) -> Optional[str]:
+        """Extrai links de redes sociais da homepage já analisada"""
+        try:
+            social_links = {}
+            
+            for a_tag in soup.find_all("a", href=True):
+                href_attr = a_tag.get("href", "")
+                if href_attr:
+                    href = href_attr.lower()
+                    
+                    if 'facebook.com' in href and not social_links.get('facebook'):
+                        social_links['facebook'] = href_attr
+                    elif 'instagram.com' in href and not social_links.get('instagram'):
+                        social_links['instagram'] = href_attr
+                    elif 'linkedin.com' in href and not social_links.get('linkedin'):
+                        social_links['linkedin'] = href_attr
+                    elif 'twitter.com' in href and not social_links.get('twitter'):
+                        social_links['twitter'] = href_attr
+                    elif 'youtube.com' in href and not social_links.get('youtube'):
+                        social_links['youtube'] = href_attr
+            
+            if social_links:
+                return ', '.join([f"{k.title()}: {v}" for k, v in social_links.items()])
+            
+            return None
+            
+        except Exception:
+            return None
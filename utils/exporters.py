@@ -0,0 +1,192 @@
+import csv
+import gzip
+import io
+from itertools import islice
+from typing import BinaryIO, Dict, Iterable, Iterator, List
+
+from utils.leads import STATUS_ERROR, STATUS_PENDING, LeadStore
+
+# Colunas numéricas (o resto é texto) para formatos tipados como Parquet
+FLOAT_COLUMNS = {'rating', 'lat', 'lng', 'prioridade'}
+INT_COLUMNS = {'reviews'}
+
+SUMMARY_LABELS = {
+    'total': 'Total de Empresas',
+    'with_phone': 'Com Telefone',
+    'with_website': 'Com Website',
+    'with_email': 'Com Email',
+    'with_cnpj': 'Com CNPJ',
+    'pending': 'Enriquecimento Pendente',
+    'failed': 'Enriquecimento com Erro'
+}
+
+
+class SummaryAccumulator:
+    """Métricas de resumo calculadas em uma única passada pelos registros"""
+
+    def __init__(self):
+        self.counts = dict.fromkeys(SUMMARY_LABELS, 0)
+        self._rating_sum = 0.0
+        self._rating_count = 0
+
+    def add(self, record: Dict):
+        counts = self.counts
+        counts['total'] += 1
+        if record.get('phone'):
+            counts['with_phone'] += 1
+        if record.get('website'):
+            counts['with_website'] += 1
+        if record.get('email_oficial') or record.get('emails_website') or record.get('email_cnpj'):
+            counts['with_email'] += 1
+        if record.get('cnpj'):
+            counts['with_cnpj'] += 1
+        status = record.get('enrichment_status')
+        if status == STATUS_PENDING:
+            counts['pending'] += 1
+        elif status == STATUS_ERROR:
+            counts['failed'] += 1
+        rating = record.get('rating')
+        if rating is not None:
+            self._rating_sum += float(rating)
+            self._rating_count += 1
+
+    @property
+    def average_rating(self):
+        return self._rating_sum / self._rating_count if self._rating_count else None
+
+    def rows(self) -> List[List]:
+        """Linhas (Métrica, Valor) da aba de resumo"""
+        rows = [[SUMMARY_LABELS[key], value] for key, value in self.counts.items()]
+        if self.average_rating is not None:
+            rows.append(['Avaliação Média', round(self.average_rating, 2)])
+        return rows
+
+
+def summarize(records: Iterable[Dict]) -> SummaryAccumulator:
+    summary = SummaryAccumulator()
+    for record in records:
+        summary.add(record)
+    return summary
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_csv(store: LeadStore, fileobj: BinaryIO, compress: bool = True, chunk_size: int = 2000) -> SummaryAccumulator:
+    """Grava os leads em CSV (gzip por padrão) bloco a bloco, sem montar o arquivo inteiro em memória"""
+    columns = store.columns()
+    summary = SummaryAccumulator()
+
+    raw = gzip.GzipFile(fileobj=fileobj, mode='wb') if compress else fileobj
+    # utf-8-sig: o Excel reconhece os acentos ao abrir o CSV
+    text = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+    try:
+        writer = csv.DictWriter(text, fieldnames=columns, extrasaction='ignore')
+        writer.writeheader()
+        for chunk in _chunks(store.records(), chunk_size):
+            for record in chunk:
+                summary.add(record)
+            writer.writerows(chunk)
+        text.flush()
+    finally:
+        # Fecha o gzip (grava o rodapé) sem fechar o arquivo de destino
+        text.detach()
+        if compress:
+            raw.close()
+    return summary
+
+
+def _excel_value(value):
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub('', value)
+    return value
+
+
+def write_excel(store: LeadStore, fileobj: BinaryIO) -> SummaryAccumulator:
+    """Grava a planilha com openpyxl em modo write-only (linhas vão direto para o arquivo)"""
+    from openpyxl import Workbook
+
+    columns = store.columns()
+    summary = SummaryAccumulator()
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Mineradoras')
+    sheet.append(columns)
+    for record in store.records():
+        summary.add(record)
+        sheet.append([_excel_value(record.get(column)) for column in columns])
+
+    summary_sheet = workbook.create_sheet('Resumo')
+    summary_sheet.append(['Métrica', 'Valor'])
+    for row in summary.rows():
+        summary_sheet.append(row)
+
+    workbook.save(fileobj)
+    return summary
+
+
+def _parquet_schema(columns: List[str]):
+    import pyarrow as pa
+
+    fields = []
+    for column in columns:
+        if column in FLOAT_COLUMNS:
+            fields.append(pa.field(column, pa.float64()))
+        elif column in INT_COLUMNS:
+            fields.append(pa.field(column, pa.int64()))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    return pa.schema(fields)
+
+
+def _coerce(value, column: str):
+    if value is None or value == '':
+        return None
+    try:
+        if column in FLOAT_COLUMNS:
+            return float(value)
+        if column in INT_COLUMNS:
+            return int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+def write_parquet(store: LeadStore, fileobj: BinaryIO, chunk_size: int = 5000) -> SummaryAccumulator:
+    """Grava os leads em Parquet com tipos por coluna, um row group por bloco"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise Exception("Exportação Parquet requer o pacote pyarrow (pip install pyarrow)")
+
+    columns = store.columns()
+    schema = _parquet_schema(columns)
+    summary = SummaryAccumulator()
+
+    with pq.ParquetWriter(fileobj, schema, compression='zstd') as writer:
+        for chunk in _chunks(store.records(), chunk_size):
+            for record in chunk:
+                summary.add(record)
+            arrays = [
+                pa.array([_coerce(record.get(column), column) for record in chunk], type=schema.field(column).type)
+                for column in columns
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+    return summary
+
+
+# Formato -> (função, extensão, mime)
+EXPORT_FORMATS = {
+    'CSV (gzip)': (write_csv, 'csv.gz', 'application/gzip'),
+    'Excel': (write_excel, 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'Parquet': (write_parquet, 'parquet', 'application/vnd.apache.parquet')
+}
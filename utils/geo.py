@@ -0,0 +1,177 @@
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+# Deslocamento que torna as colunas da grade não negativas antes de compor a chave da célula
+_COL_OFFSET = 1 << 31
+
+
+def haversine_km(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """Distância em km entre pontos (graus), vetorizada com broadcasting"""
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class _Grid:
+    """Pontos agrupados em células de tamanho fixo, ordenados pela chave da célula"""
+
+    def __init__(self, lat: np.ndarray, lng: np.ndarray, cell_km: float):
+        self.cell_lat = cell_km / KM_PER_DEGREE
+        # Células mais largas em longitude garantem ao menos cell_km de largura em todo o conjunto
+        max_abs_lat = float(np.abs(lat).max()) if len(lat) else 0.0
+        self.cell_lng = self.cell_lat / max(np.cos(np.radians(min(max_abs_lat, 89.0))), 1e-6)
+
+        self.rows = np.floor(lat / self.cell_lat).astype(np.int64)
+        self.cols = np.floor(lng / self.cell_lng).astype(np.int64)
+        keys = self.key(self.rows, self.cols)
+        self.order = np.argsort(keys, kind='stable')
+        self.sorted_keys = keys[self.order]
+
+    @staticmethod
+    def key(rows, cols):
+        return rows * (1 << 32) + (cols + _COL_OFFSET)
+
+    def cells_around(self, lat: float, lng: float, radius_km: float) -> np.ndarray:
+        """Índices dos pontos nas células que cobrem o círculo (candidatos, sem filtrar a distância)"""
+        d_lat = radius_km / KM_PER_DEGREE
+        d_lng = d_lat / max(np.cos(np.radians(min(abs(lat) + d_lat, 89.0))), 1e-6)
+        rows = np.arange(np.floor((lat - d_lat) / self.cell_lat), np.floor((lat + d_lat) / self.cell_lat) + 1)
+        cols = np.arange(np.floor((lng - d_lng) / self.cell_lng), np.floor((lng + d_lng) / self.cell_lng) + 1)
+        if len(rows) * len(cols) > len(self.order):
+            # Círculo maior que o conjunto: mais barato examinar todos os pontos
+            return np.arange(len(self.order))
+        keys = self.key(rows.astype(np.int64)[:, None], cols.astype(np.int64)[None, :]).ravel()
+        lo, counts = self._ranges(keys)
+        return self.order[self._expand(lo, counts)]
+
+    def _ranges(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Início e quantidade de pontos de cada célula pedida"""
+        lo = np.searchsorted(self.sorted_keys, keys, side='left')
+        hi = np.searchsorted(self.sorted_keys, keys, side='right')
+        return lo, hi - lo
+
+    @staticmethod
+    def _expand(lo: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """Concatena os intervalos [lo, lo + count) de uma vez, sem laço em Python"""
+        total = int(counts.sum())
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        return np.repeat(lo, counts) + offsets
+
+    def neighbor_pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Pares (i, j), i != j, em células vizinhas, cada par uma única vez"""
+        sources, targets = [], []
+        n = len(self.rows)
+        # Metade da vizinhança 3x3: cada par de células vizinhas é visitado uma vez
+        for d_row, d_col in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+            lo, counts = self._ranges(self.key(self.rows + d_row, self.cols + d_col))
+            src = np.repeat(np.arange(n), counts)
+            dst = self.order[self._expand(lo, counts)]
+            keep = src < dst if (d_row, d_col) == (0, 0) else np.ones(len(src), dtype=bool)
+            sources.append(src[keep])
+            targets.append(dst[keep])
+        return np.concatenate(sources), np.concatenate(targets)
+
+
+class LeadSpatialIndex:
+    """Índice espacial em grade sobre as coordenadas dos leads
+
+    Consultas de raio e de vizinhos mais próximos olham só as células próximas,
+    com distâncias haversine calculadas em lote pelo NumPy.
+    """
+
+    def __init__(self, lats: Sequence[Optional[float]], lngs: Sequence[Optional[float]], cell_km: float = 10.0):
+        lat = np.asarray(lats, dtype=float)
+        lng = np.asarray(lngs, dtype=float)
+        valid = np.isfinite(lat) & np.isfinite(lng)
+        # Posições originais (no store) dos leads com coordenadas
+        self.ids = np.flatnonzero(valid)
+        self.lat = lat[valid]
+        self.lng = lng[valid]
+        self.cell_km = cell_km
+        self._grid = _Grid(self.lat, self.lng, cell_km)
+
+    @classmethod
+    def from_store(cls, store, cell_km: float = 10.0) -> "LeadSpatialIndex":
+        lats = [np.nan if lead.lat is None else lead.lat for lead in store]
+        lngs = [np.nan if lead.lng is None else lead.lng for lead in store]
+        return cls(lats, lngs, cell_km)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def within_radius(self, lat: float, lng: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Leads a até radius_km do ponto: (posições no store, distâncias em km), do mais próximo ao mais distante"""
+        candidates = self._grid.cells_around(lat, lng, radius_km)
+        distances = haversine_km(lat, lng, self.lat[candidates], self.lng[candidates])
+        inside = distances <= radius_km
+        candidates, distances = candidates[inside], distances[inside]
+        order = np.argsort(distances, kind='stable')
+        return self.ids[candidates[order]], distances[order]
+
+    def nearest(self, lat: float, lng: float, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """Os k leads mais próximos do ponto: (posições no store, distâncias em km)"""
+        k = min(k, len(self))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        # Raio crescente até conter k pontos; tudo dentro do raio foi examinado, então o resultado é exato
+        radius = self.cell_km
+        while True:
+            ids, distances = self.within_radius(lat, lng, radius)
+            if len(ids) >= k or radius > np.pi * EARTH_RADIUS_KM:
+                return ids[:k], distances[:k]
+            radius *= 2
+
+    def find_duplicates(
+        self,
+        radius_m: float = 150,
+        names: Optional[Sequence[str]] = None,
+        min_name_similarity: float = 0.6
+    ) -> List[List[int]]:
+        """Grupos de leads (posições no store) a menos de radius_m uns dos outros
+
+        Com `names` (indexado pela posição no store), o par também precisa ter nomes parecidos.
+        """
+        if len(self) < 2:
+            return []
+
+        grid = _Grid(self.lat, self.lng, radius_m / 1000)
+        src, dst = grid.neighbor_pairs()
+        distances = haversine_km(self.lat[src], self.lng[src], self.lat[dst], self.lng[dst])
+        close = distances * 1000 <= radius_m
+        pairs = zip(self.ids[src[close]].tolist(), self.ids[dst[close]].tolist())
+
+        if names is not None:
+            pairs = (
+                (a, b) for a, b in pairs
+                if _name_similarity(names[a], names[b]) >= min_name_similarity
+            )
+
+        # União dos pares em grupos (union-find)
+        parent: Dict[int, int] = {}
+
+        def find(x: int) -> int:
+            parent.setdefault(x, x)
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for a, b in pairs:
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        groups: Dict[int, List[int]] = {}
+        for x in parent:
+            groups.setdefault(find(x), []).append(x)
+        return sorted((sorted(group) for group in groups.values()), key=lambda group: group[0])
+
+
+def _name_similarity(a: Optional[str], b: Optional[str]) -> float:
+    return SequenceMatcher(None, (a or '').lower(), (b or '').lower()).ratio()
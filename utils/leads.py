@@ -0,0 +1,92 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Campos do registro base de um lead (coordenadas achatadas em lat/lng)
+LEAD_FIELDS = (
+    'name', 'address', 'phone', 'website', 'rating', 'reviews', 'type', 'snippet',
+    'place_id', 'lat', 'lng', 'search_term', 'search_timestamp'
+)
+
+# Valores de enrichment_status
+STATUS_ENRICHED = 'enriquecido'
+STATUS_PENDING = 'pendente'
+STATUS_ERROR = 'erro'
+
+
+class Lead:
+    """Registro compacto de uma empresa encontrada (slots, sem dict por instância)"""
+
+    __slots__ = LEAD_FIELDS
+
+    def __init__(self, **fields):
+        for field in LEAD_FIELDS:
+            setattr(self, field, fields.get(field))
+
+    def get(self, key: str, default=None):
+        """Acesso no estilo dict, para o código que trata leads e dicts igualmente"""
+        if key in LEAD_FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return default
+
+    def __getitem__(self, key: str):
+        if key not in LEAD_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def to_dict(self) -> Dict:
+        return {field: getattr(self, field) for field in LEAD_FIELDS}
+
+    def __repr__(self) -> str:
+        return f"Lead(name={self.name!r}, address={self.address!r})"
+
+
+class LeadStore:
+    """Armazenamento canônico dos leads: registros base e deltas do enriquecimento
+
+    O enriquecimento guarda apenas os campos novos de cada lead, sem copiar o registro base.
+    """
+
+    def __init__(self, leads: Optional[Iterable[Lead]] = None):
+        self.leads: List[Lead] = list(leads or [])
+        self.enrichment: Dict[int, Dict] = {}
+
+    def __len__(self) -> int:
+        return len(self.leads)
+
+    def __bool__(self) -> bool:
+        return bool(self.leads)
+
+    def __iter__(self) -> Iterator[Lead]:
+        return iter(self.leads)
+
+    def extend(self, leads: Iterable[Lead]):
+        self.leads.extend(leads)
+
+    def set_enrichment(self, index: int, delta: Dict):
+        if delta:
+            self.enrichment[index] = delta
+        else:
+            self.enrichment.pop(index, None)
+
+    def record(self, index: int) -> Dict:
+        """Registro completo (base + enriquecimento) de um lead"""
+        record = self.leads[index].to_dict()
+        record.update(self.enrichment.get(index, {}))
+        return record
+
+    def records(self) -> Iterator[Dict]:
+        for index in range(len(self.leads)):
+            yield self.record(index)
+
+    def columns(self) -> List[str]:
+        """Campos base seguidos dos campos de enriquecimento, na ordem em que surgiram"""
+        columns = dict.fromkeys(LEAD_FIELDS)
+        for delta in self.enrichment.values():
+            columns.update(dict.fromkeys(delta))
+        return list(columns)
+
+    def to_dataframe(self, columns: Optional[List[str]] = None):
+        """DataFrame montado sob demanda a partir dos registros"""
+        import pandas as pd
+
+        return pd.DataFrame(self.records(), columns=columns or self.columns())
@@ -0,0 +1,213 @@
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+# Limites (em segundos) dos buckets dos histogramas de tempo
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+# Amostras mais recentes guardadas por histograma para os percentis
+SAMPLE_WINDOW = 1024
+
+
+def percentile(samples: List[float], p: float) -> Optional[float]:
+    """Percentil p (0-100) pelo método do vizinho mais próximo"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+class Histogram:
+    """Histograma de tempos com buckets fixos e janela de amostras recentes para percentis
+
+    Contagem, soma, máximo e buckets cobrem todas as observações; os percentis usam
+    só as últimas `window` amostras, para que a memória e o custo não cresçam com a execução.
+    """
+
+    def __init__(self, buckets: Optional[List[float]] = None, window: int = SAMPLE_WINDOW):
+        self.buckets = buckets or LATENCY_BUCKETS
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = None
+
+    def observe(self, value: float):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+        if self.max is None or value > self.max:
+            self.max = value
+        for i, limit in enumerate(self.buckets):
+            if value <= limit:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        return percentile(list(self.samples), p)
+
+    def snapshot(self) -> "Histogram":
+        """Cópia independente, para calcular percentis fora de um lock"""
+        copy = Histogram(self.buckets, self.samples.maxlen)
+        copy.samples.extend(self.samples)
+        copy.counts = list(self.counts)
+        copy.count, copy.total, copy.max = self.count, self.total, self.max
+        return copy
+
+    def to_dict(self) -> Dict:
+        labels = [f"<={limit}s" for limit in self.buckets] + [f">{self.buckets[-1]}s"]
+        ordered = sorted(self.samples)
+        return {
+            'count': self.count,
+            'total_s': round(self.total, 4),
+            'mean_s': round(self.total / self.count, 4) if self.count else None,
+            'p50_s': percentile(ordered, 50),
+            'p95_s': percentile(ordered, 95),
+            'max_s': self.max,
+            'buckets': dict(zip(labels, self.counts))
+        }
+
+
+class PipelineMetrics:
+    """Coleta métricas de desempenho de uma execução do pipeline"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.stages: Dict[str, Histogram] = {}
+        self.hosts: Dict[str, Histogram] = {}
+        self.bytes_by_host: Dict[str, int] = {}
+        self.requests_by_host: Dict[str, int] = {}
+        self.cache: Dict[str, Dict[str, int]] = {}
+        self.retries: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.counters: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Mede o tempo gasto em um estágio do pipeline"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(name, time.perf_counter() - start)
+
+    def observe_stage(self, name: str, elapsed: float):
+        with self._lock:
+            self.stages.setdefault(name, Histogram()).observe(elapsed)
+
+    def record_request(self, url: str, elapsed: float, num_bytes: int = 0):
+        """Registra uma requisição HTTP concluída"""
+        host = urlparse(url).netloc or url
+        with self._lock:
+            self.hosts.setdefault(host, Histogram()).observe(elapsed)
+            self.bytes_by_host[host] = self.bytes_by_host.get(host, 0) + num_bytes
+            self.requests_by_host[host] = self.requests_by_host.get(host, 0) + 1
+
+    def record_cache(self, name: str, hit: bool):
+        with self._lock:
+            entry = self.cache.setdefault(name, {'hits': 0, 'misses': 0})
+            entry['hits' if hit else 'misses'] += 1
+
+    def record_retry(self, name: str):
+        self.increment(name, target=self.retries)
+
+    def record_error(self, category: str):
+        self.increment(category, target=self.errors)
+
+    def increment(self, name: str, amount: int = 1, target: Optional[Dict[str, int]] = None):
+        target = self.counters if target is None else target
+        with self._lock:
+            target[name] = target.get(name, 0) + amount
+
+    def host_percentile(self, host: str, p: float, min_samples: int = 1) -> Optional[float]:
+        """Percentil da latência do host (None com menos de min_samples requisições)"""
+        with self._lock:
+            histogram = self.hosts.get(host)
+            if not histogram or histogram.count < min_samples:
+                return None
+            samples = list(histogram.samples)
+        # Ordenação fora do lock: crawler e hedging disputam as mesmas métricas
+        return percentile(samples, p)
+
+    def total_requests(self) -> int:
+        with self._lock:
+            return sum(self.requests_by_host.values())
+
+    def to_dict(self) -> Dict:
+        """Relatório serializável das métricas coletadas"""
+        with self._lock:
+            stages = {name: h.snapshot() for name, h in self.stages.items()}
+            hosts = {host: h.snapshot() for host, h in self.hosts.items()}
+            requests_by_host = dict(self.requests_by_host)
+            bytes_by_host = dict(self.bytes_by_host)
+            cache = {name: dict(entry) for name, entry in self.cache.items()}
+            retries, errors, counters = dict(self.retries), dict(self.errors), dict(self.counters)
+
+        # Percentis calculados sobre as cópias, sem segurar o lock
+        return {
+            'duration_s': round(time.time() - self.started_at, 3),
+            'stages': {name: h.to_dict() for name, h in stages.items()},
+            'hosts': {
+                host: {
+                    **h.to_dict(),
+                    'requests': requests_by_host.get(host, 0),
+                    'bytes': bytes_by_host.get(host, 0)
+                }
+                for host, h in hosts.items()
+            },
+            'cache': {
+                name: {
+                    **entry,
+                    'hit_rate': round(entry['hits'] / (entry['hits'] + entry['misses']), 4)
+                    if entry['hits'] + entry['misses'] else None
+                }
+                for name, entry in cache.items()
+            },
+            'retries': retries,
+            'errors': errors,
+            'counters': counters
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+
+def categorize_error(error: Exception) -> str:
+    """Classifica uma exceção em uma categoria de erro"""
+    if isinstance(error, requests.exceptions.Timeout):
+        return 'timeout'
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return 'connection'
+    if isinstance(error, requests.exceptions.HTTPError):
+        status = error.response.status_code if error.response is not None else 0
+        return f"http_{status // 100}xx"
+    if isinstance(error, ValueError):
+        return 'parse'
+    return 'other'
+
+
+def timed_get(session: requests.Session, url: str, metrics: Optional[PipelineMetrics] = None, **kwargs) -> requests.Response:
+    """Executa session.get registrando tempo, bytes e erros"""
+    start = time.perf_counter()
+    try:
+        response = session.get(url, **kwargs)
+    except requests.exceptions.RequestException as e:
+        if metrics:
+            metrics.record_request(url, time.perf_counter() - start)
+            metrics.record_error(categorize_error(e))
+        raise
+    if metrics:
+        metrics.record_request(url, time.perf_counter() - start, len(response.content))
+        if response.status_code >= 400:
+            metrics.record_error(f"http_{response.status_code // 100}xx")
+    return response
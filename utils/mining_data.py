@@ -1,49 +1,98 @@
-# utils/mining_data.py
-
-# Dicionário com os termos de busca para a prospecção
-MINING_SEARCH_TERMS = {
-    "Extracao Ferro": {
-        "description": "Busca por mineradoras de ferro",
-        "query": "extração de minério de ferro"
-    },
-    "Extracao Bauxita": {
-        "description": "Busca por mineradoras de bauxita/alumínio",
-        "query": "extração de bauxita"
-    },
-    "Extracao Ouro": {
-        "description": "Busca por extração de ouro e garimpos",
-        "query": "mineração de ouro"
-    },
-    "Extracao Cobre": {
-        "description": "Busca por mineradoras de cobre",
-        "query": "mineração de cobre"
-    },
-    "Extracao Manganes": {
-        "description": "Busca por mineradoras de manganês",
-        "query": "extração de manganês"
-    },
-    "Pedreiras": {
-        "description": "Busca por pedreiras (brita, areia, cascalho)",
-        "query": "pedreira brita cascalho"
-    },
-    "Equipamentos Mineracao": {
-        "description": "Fornecedores de equipamentos de mineração",
-        "query": "equipamentos para mineração"
-    },
-    "Cooperativas Garimpeiros": {
-        "description": "Busca por cooperativas de garimpeiros",
-        "query": "cooperativa de garimpeiros"
-    }
-}
-
-# Dicionário com CNAEs relevantes para mineração (pode ser usado no futuro)
-MINING_CNAES = {
-    "0710-3/01": "Extração de minério de ferro",
-    "0721-9/01": "Extração de minério de alumínio",
-    "0724-3/01": "Extração de minério de metais preciosos",
-    "0729-4/04": "Extração de minérios de cobre, chumbo, zinco e outros",
-    "0810-0/00": "Extração de pedra, areia e argila",
-    "0990-4/01": "Atividades de apoio à extração de minério de ferro",
-    "0990-4/02": "Atividades de apoio à extração de minerais metálicos não ferrosos",
-    "0990-4/03": "Atividades de apoio à extração de minerais não metálicos"
-}
+# utils/mining_data.py
+
+# Dicionário com os termos de busca para a prospecção
+MINING_SEARCH_TERMS = {
+    "Extracao Ferro": {
+        "description": "Busca por mineradoras de ferro",
+        "query": "extração de minério de ferro"
+    },
+    "Extracao Bauxita": {
+        "description": "Busca por mineradoras de bauxita/alumínio",
+        "query": "extração de bauxita"
+    },
+    "Extracao Ouro": {
+        "description": "Busca por extração de ouro e garimpos",
+        "query": "mineração de ouro"
+    },
+    "Extracao Cobre": {
+        "description": "Busca por mineradoras de cobre",
+        "query": "mineração de cobre"
+    },
+    "Extracao Manganes": {
+        "description": "Busca por mineradoras de manganês",
+        "query": "extração de manganês"
+    },
+    "Pedreiras": {
+        "description": "Busca por pedreiras (brita, areia, cascalho)",
+        "query": "pedreira brita cascalho"
+    },
+    "Equipamentos Mineracao": {
+        "description": "Fornecedores de equipamentos de mineração",
+        "query": "equipamentos para mineração"
+    },
+    "Cooperativas Garimpeiros": {
+        "description": "Busca por cooperativas de garimpeiros",
+        "query": "cooperativa de garimpeiros"
+    }
+}
+
+# Dicionário com CNAEs relevantes para mineração (pode ser usado no futuro)
+MINING_CNAES = {
+    "0710-3/01": "Extração de minério de ferro",
+    "0721-9/01": "Extração de minério de alumínio",
+    "0724-3/01": "Extração de minério de metais preciosos",
+    "0729-4/04": "Extração de minérios de cobre, chumbo, zinco e outros",
+    "0810-0/00": "Extração de pedra, areia e argila",
+    "0990-4/01": "Atividades de apoio à extração de minério de ferro",
+    "0990-4/02": "Atividades de apoio à extração de minerais metálicos não ferrosos",
+    "0990-4/03": "Atividades de apoio à extração de minerais não metálicos"
+}
+
+# Palavras-chave que indicam atividade de mineração (nome, descrição, tipo ou endereço)
+MINING_KEYWORDS = [
+    # Principais termos de mineração
+    'mineração', 'mineradora', 'minério', 'extração', 'mina', 'lavra',
+    'garimpo', 'garimpeira', 'cooperativa', 'associação',
+    
+    # Minerais específicos do Pará
+    'ferro', 'bauxita', 'ouro', 'cobre', 'alumínio', 'manganês', 
+    'níquel', 'estanho', 'cassiterita', 'caulim', 'calcário',
+    'granito', 'quartzito', 'gemas', 'diamante', 'esmeralda',
+    
+    # Agregados e materiais de construção
+    'pedreira', 'areia', 'brita', 'cascalho', 'argila', 'saibro',
+    'britagem', 'peneiramento', 'beneficiamento',
+    
+    # Atividades de apoio
+    'equipamentos mineração', 'perfuração', 'desmonte', 
+    'terraplanagem', 'dragagem', 'consultoria mineral',
+    'explosivos', 'pelotização', 'concentração', 'flotação'
+]
+
+# Palavras-chave de estabelecimentos fora do público-alvo
+EXCLUDE_KEYWORDS = [
+    'restaurante', 'lanchonete', 'bar', 'hotel', 'pousada', 'motel',
+    'supermercado', 'farmácia', 'posto', 'oficina', 'loja', 'shopping',
+    'escola', 'hospital', 'clínica', 'banco', 'agência', 'cartório',
+    'advocacia', 'escritório', 'contabilidade', 'imobiliária',
+    'igreja', 'templo', 'salão', 'barbearia', 'academia', 'veterinária'
+]
+
+# Indicadores de localização no estado do Pará
+PARA_INDICATORS = ['pará', 'pa', 'belém', 'marabá', 'santarém', 'altamira', 'parauapebas', 'carajás']
+
+# Municípios de referência para planejamento de território (latitude, longitude)
+PARA_REFERENCE_POINTS = {
+    "Parauapebas": (-6.0676, -49.9022),
+    "Marabá": (-5.3686, -49.1178),
+    "Canaã dos Carajás": (-6.4966, -49.8776),
+    "Curionópolis": (-6.0997, -49.6047),
+    "Ourilândia do Norte": (-6.7528, -51.0858),
+    "Itaituba": (-4.2761, -55.9836),
+    "Altamira": (-3.2033, -52.2064),
+    "Santarém": (-2.4385, -54.6996),
+    "Oriximiná": (-1.7656, -55.8661),
+    "Paragominas": (-2.9967, -47.3533),
+    "Barcarena": (-1.5058, -48.6258),
+    "Belém": (-1.4558, -48.4902)
+}
@@ -0,0 +1,111 @@
+import heapq
+import math
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from utils.leads import STATUS_ENRICHED, STATUS_ERROR, STATUS_PENDING, Lead, LeadStore
+from utils.metrics import PipelineMetrics
+from utils.serp_client import MINING_MATCHER
+
+
+def lead_priority(lead: Lead) -> float:
+    """Quão promissor é um lead, a partir dos sinais do Google Maps"""
+    score = math.log1p(lead.get('reviews', 0) or 0)
+    if lead.get('website'):
+        score += 2.0
+    if MINING_MATCHER.matches(lead.get('name', '').lower()):
+        score += 3.0
+    if lead.get('phone'):
+        score += 0.5
+    rating = lead.get('rating')
+    if rating:
+        score += (float(rating) - 3.0) * 0.5
+    return score
+
+
+class EnrichmentScheduler:
+    """Enriquece os leads mais promissores primeiro, dentro de um orçamento de tempo e de requisições
+
+    Quando o orçamento acaba, os leads restantes ficam marcados como pendentes.
+    """
+
+    def __init__(
+        self,
+        enricher,
+        max_seconds: Optional[float] = None,
+        max_requests: Optional[int] = None,
+        priority: Callable[[Lead], float] = lead_priority
+    ):
+        # O orçamento de requisições é medido pelas métricas da execução
+        self.enricher = enricher if enricher.metrics else enricher.for_run(PipelineMetrics())
+        self.max_seconds = max_seconds
+        self.max_requests = max_requests
+        self.priority = priority
+
+    def run(
+        self,
+        store: LeadStore,
+        include_cnpj: bool = True,
+        include_contacts: bool = True,
+        progress_callback=None,
+        crawl_contact_pages: bool = True
+    ) -> Dict:
+        """Enriquece o store em ordem de prioridade e devolve um resumo da execução"""
+        start = time.monotonic()
+        start_requests = self.enricher.metrics.total_requests()
+
+        scores = [self.priority(lead) for lead in store]
+        # Fila de prioridade (maior score primeiro; empate mantém a ordem da busca)
+        queue: List[Tuple[float, int]] = [(-score, i) for i, score in enumerate(scores)]
+        heapq.heapify(queue)
+        order: List[int] = []
+
+        def next_leads() -> Iterator[Lead]:
+            while queue:
+                _, index = heapq.heappop(queue)
+                order.append(index)
+                yield store.leads[index]
+
+        stopped_by = None
+        done = set()
+        failed = 0
+        deltas = self.enricher.iter_enrichment(
+            next_leads(), include_cnpj, include_contacts, progress_callback, crawl_contact_pages, total=len(store)
+        )
+        for delta in deltas:
+            index = order[len(done)]
+            if delta is None:
+                # Falha no enriquecimento: não conta como enriquecido nem como pendente
+                failed += 1
+                store.set_enrichment(index, {'prioridade': round(scores[index], 2), 'enrichment_status': STATUS_ERROR})
+            else:
+                store.set_enrichment(index, {**delta, 'prioridade': round(scores[index], 2), 'enrichment_status': STATUS_ENRICHED})
+            done.add(index)
+
+            stopped_by = self._budget_exhausted(start, start_requests)
+            if stopped_by and queue:
+                break
+            stopped_by = None
+        deltas.close()
+
+        pending = [i for i in range(len(store)) if i not in done]
+        for index in pending:
+            store.set_enrichment(index, {'prioridade': round(scores[index], 2), 'enrichment_status': STATUS_PENDING})
+
+        if self.enricher.metrics and pending:
+            self.enricher.metrics.increment('leads_pending', len(pending))
+
+        return {
+            'enriched': len(done) - failed,
+            'failed': failed,
+            'pending': len(pending),
+            'stopped_by': stopped_by,
+            'elapsed_s': round(time.monotonic() - start, 2)
+        }
+
+    def _budget_exhausted(self, start: float, start_requests: int) -> Optional[str]:
+        if self.max_seconds is not None and time.monotonic() - start >= self.max_seconds:
+            return 'tempo'
+        if self.max_requests is not None and self.enricher.metrics.total_requests() - start_requests >= self.max_requests:
+            return 'requisições'
+        return None
@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Resultado de uma consulta ao cache
+HIT, MISS, COALESCED = 'hit', 'miss', 'coalesced'
+
+
+class _Flight:
+    """Busca em andamento que outras threads podem aguardar"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SharedCache:
+    """Cache em memória compartilhado entre sessões, com TTL, LRU e single-flight
+
+    Requisições simultâneas pela mesma chave resultam em uma única busca;
+    as demais threads aguardam e recebem o mesmo resultado (ou a mesma exceção).
+    """
+
+    def __init__(self, max_entries: int = 5000, ttl: float = 3600, empty_ttl: float = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # Resultados vazios (None) expiram antes: podem vir de uma falha passageira
+        self.empty_ttl = empty_ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Tuple[Any, str]:
+        """Valor da chave e como foi obtido: HIT, MISS (calculado aqui) ou COALESCED"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return entry[1], HIT
+                del self._entries[key]
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, COALESCED
+
+        try:
+            flight.value = compute()
+        except BaseException as e:
+            # Exceções não são guardadas: só repassadas a quem aguardava esta busca
+            flight.error = e
+            raise
+        else:
+            self._store(key, flight.value)
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+        return flight.value, MISS
+
+    def _store(self, key: Hashable, value: Any):
+        ttl = self.empty_ttl if value is None else self.ttl
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def cached_call(cache: SharedCache, metrics, name: str, key: Hashable, compute: Callable[[], Any]) -> Any:
+    """Consulta o cache sob o espaço `name`, registrando acertos e coalescências nas métricas"""
+    value, status = cache.get_or_compute((name, key), compute)
+    if metrics:
+        metrics.record_cache(name, hit=status != MISS)
+        if status == COALESCED:
+            metrics.increment(f"{name}_coalesced")
+    return value
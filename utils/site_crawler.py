@@ -0,0 +1,209 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urldefrag, urljoin, urlparse
+
+import tldextract
+from bs4 import BeautifulSoup
+
+# Usa a lista de sufixos embutida no pacote, sem baixar nada da internet. Os sufixos privados
+# (blogspot.com, wixsite.com...) fazem 'loja.wixsite.com' ser um domínio próprio, não 'wixsite.com'
+_TLD_EXTRACT = tldextract.TLDExtract(suffix_list_urls=(), include_psl_private_domains=True)
+
+# Plataformas que hospedam páginas de muitas empresas: o domínio não identifica a empresa
+MULTI_TENANT_HOSTS = (
+    'facebook.com', 'fb.com', 'instagram.com', 'linkedin.com', 'twitter.com', 'x.com', 'youtube.com',
+    'tiktok.com', 'linktr.ee', 'wa.me', 'whatsapp.com', 'sites.google.com', 'g.page', 'goo.gl',
+    'business.site', 'negocio.site', 'wixsite.com', 'blogspot.com', 'wordpress.com', 'webnode.page',
+    'site123.me', 'bit.ly'
+)
+
+# Trechos de URL ou texto de link que indicam páginas com contatos
+CONTACT_HINTS = (
+    'contato', 'contatos', 'fale-conosco', 'faleconosco', 'fale_conosco', 'fale conosco',
+    'atendimento', 'contact', 'quem-somos', 'quem somos', 'sobre', 'about', 'unidades'
+)
+# Cada dica só vale como palavra inteira ('sobre' não casa com '/sobremesa')
+_HINT_PATTERNS = [re.compile(rf'(?<![^\W_]){re.escape(hint)}(?![^\W_])') for hint in CONTACT_HINTS]
+
+# Arquivos que não valem o download
+SKIPPED_EXTENSIONS = ('.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.zip', '.doc', '.docx', '.xls', '.xlsx', '.mp4')
+
+
+class HostThrottle:
+    """Espaça o início das requisições a um mesmo host (politeness)"""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot: Dict[str, float] = {}
+
+    def wait(self, host: str):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _host(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def registered_domain(url: str) -> Optional[str]:
+    """Domínio registrado da URL (ex.: 'grupo.com.br' para 'https://maraba.grupo.com.br/x')"""
+    ext = _TLD_EXTRACT(url)
+    if not ext.domain or not ext.suffix:
+        return None
+    return f"{ext.domain}.{ext.suffix}".lower()
+
+
+def is_multi_tenant(url: str) -> bool:
+    host = _host(url)
+    return any(host == tenant or host.endswith('.' + tenant) for tenant in MULTI_TENANT_HOSTS)
+
+
+def website_key(url: str) -> str:
+    """Chave de agrupamento de sites: domínio registrado, ou a própria URL (IPs, localhost)
+
+    Em plataformas compartilhadas (Facebook, Instagram, sites.google.com...) a chave é
+    host + caminho, para que páginas de empresas diferentes não sejam agrupadas.
+    """
+    if is_multi_tenant(url):
+        parsed = urlparse(urldefrag(url)[0])
+        query = f"?{parsed.query}" if parsed.query else ''
+        return f"{_host(url)}{parsed.path.rstrip('/')}{query}".lower()
+    return registered_domain(url) or urldefrag(url)[0].lower()
+
+
+class ContactCrawler:
+    """Visita páginas de contato do site de uma empresa a partir da homepage
+
+    Usa o DataEnricher para baixar (com cache e métricas) e extrair contatos.
+    """
+
+    def __init__(
+        self,
+        enricher,
+        max_pages_per_domain: int = 4,
+        max_depth: int = 1,
+        max_workers: int = 3,
+        politeness_delay: float = 0.25
+    ):
+        self.enricher = enricher
+        self.max_pages_per_domain = max_pages_per_domain
+        self.max_depth = max_depth
+        self.max_workers = max_workers
+        self.throttle = HostThrottle(politeness_delay)
+
+    def crawl(self, homepage: str, html: Optional[str] = None, soup: Optional[BeautifulSoup] = None) -> Optional[Dict]:
+        """Contatos da homepage e das páginas de contato encontradas nela
+
+        Quem já baixou e analisou a homepage passa `html` e `soup` para evitar refazer o trabalho.
+        """
+        if not homepage or not homepage.startswith('http'):
+            return None
+
+        if html is None:
+            html = self.fetch(homepage)
+            if html is None:
+                return None
+        if soup is None:
+            soup = BeautifulSoup(html, "html.parser")
+
+        emails, phones = {}, {}
+        contact_pages = []
+        self._collect(html, emails, phones)
+
+        visited = {urldefrag(homepage)[0]}
+        frontier = [(homepage, soup)]
+        budget = self.max_pages_per_domain - 1
+
+        depth = 0
+        # Para assim que houver email e telefone (a homepage pode bastar)
+        while frontier and budget > 0 and depth < self.max_depth and not (emails and phones):
+            candidates = []
+            for page_url, page_soup in frontier:
+                for link in self._contact_links(page_url, page_soup):
+                    if link not in visited and len(candidates) < budget:
+                        visited.add(link)
+                        candidates.append(link)
+            if not candidates:
+                break
+
+            budget -= len(candidates)
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(candidates))) as pool:
+                pages = list(zip(candidates, pool.map(self.fetch, candidates)))
+
+            frontier = []
+            for page_url, page_html in pages:
+                if page_html is None:
+                    continue
+                if self._collect(page_html, emails, phones):
+                    contact_pages.append(page_url)
+                # Só analisa a página se os links dela ainda podem ser seguidos
+                if depth + 1 < self.max_depth:
+                    frontier.append((page_url, BeautifulSoup(page_html, "html.parser")))
+            depth += 1
+
+        if self.enricher.metrics:
+            self.enricher.metrics.increment('contact_pages_crawled', len(visited) - 1)
+
+        contacts = {}
+        if emails:
+            contacts['emails_website'] = ', '.join(emails)
+        if phones:
+            contacts['telefones_website'] = ', '.join(phones)
+        if contacts and contact_pages:
+            contacts['paginas_contato'] = ', '.join(contact_pages)
+        return contacts if contacts else None
+
+    def fetch(self, url: str) -> Optional[str]:
+        """Baixa a página pelo enricher, respeitando o intervalo por host"""
+        self.throttle.wait(_host(url))
+        return self.enricher.fetch_page(url)
+
+    def _collect(self, html: str, emails: Dict, phones: Dict) -> bool:
+        """Acumula contatos da página; indica se ela trouxe algum contato novo"""
+        found = self.enricher.contact_extractor.extract(html)
+        new = False
+        for email in found['emails']:
+            if email not in emails:
+                emails[email] = None
+                new = True
+        for phone in found['phones']:
+            if phone not in phones:
+                phones[phone] = None
+                new = True
+        return new
+
+    def _contact_links(self, page_url: str, soup: BeautifulSoup) -> List[str]:
+        """Links do mesmo site que parecem levar a páginas de contato, mais promissores primeiro"""
+        host = _host(page_url)
+        scored = {}
+        for a_tag in soup.find_all("a", href=True):
+            href = a_tag.get("href", "").strip()
+            if not href or href.startswith(('mailto:', 'tel:', 'javascript:', '#')):
+                continue
+
+            url = urldefrag(urljoin(page_url, href))[0]
+            parsed = urlparse(url)
+            if parsed.scheme not in ('http', 'https') or _host(url) != host:
+                continue
+            if parsed.path.lower().endswith(SKIPPED_EXTENSIONS):
+                continue
+
+            target = f"{parsed.path} {a_tag.get_text(' ', strip=True)}".lower()
+            # Dicas mais ao início da lista (contato, fale conosco) valem mais
+            score = max(
+                (len(CONTACT_HINTS) - i for i, pattern in enumerate(_HINT_PATTERNS) if pattern.search(target)),
+                default=0
+            )
+            if score:
+                scored[url] = max(score, scored.get(url, 0))
+
+        return sorted(scored, key=scored.get, reverse=True)